@@ -7,19 +7,19 @@
 #
 # CREATED:	    02/28/2019
 #
-# LAST EDITED:	    03/01/2019
+# LAST EDITED:      10/18/2026
 ###
 
-from argparse import ArgumentParser, RawTextHelpFormatter
-from pathlib import Path
+# Only the modules every command needs are imported here. `print' runs on
+# every prompt, so the others are imported by the functions using them.
+#pylint: disable=import-outside-toplevel
 import os
 import sys
-import re
-from glob import glob
+import time
 
-from t import t
-from colorama import colorama
-from colorama.colorama import Fore, Style
+# The components that have been split out of this script live in src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                                'src'))
 
 ###############################################################################
 # Class BugTracker
@@ -39,6 +39,7 @@ class BugTracker:
     @staticmethod
     def parseArgs(args):
         """Parse 'args' as a list of command line arguments."""
+        from argparse import ArgumentParser, RawTextHelpFormatter
         parser = ArgumentParser()
         subparsers = parser.add_subparsers(dest='function',
                                            help='help for subcommand')
@@ -58,16 +59,233 @@ class BugTracker:
                                                        'the output. Only '
                                                        'valid if --path is not'
                                                        ' none'))
-        subparsers.add_parser('print', help=('Print the list of bugs for this'
-                                             ' repository'))
+        BugTracker.addScanArguments(updateParser)
+        updateParser.add_argument("--rev", type=str, metavar='COMMIT',
+                                  help=('Scan the files of this commit, read '
+                                        'from the object store, instead of '
+                                        'the working tree'))
+        updateParser.add_argument("--stdout", action="store_true",
+                                  default=False,
+                                  help=('Print the bugs of each file as '
+                                        'soon as they are known, instead of '
+                                        'writing the bugs file. Files whose '
+                                        'bugs are cached come out before '
+                                        'those still being scanned'))
+        updateParser.add_argument("--shard-depth", type=int, metavar='N',
+                                  help=('Split the bugs file in one file per '
+                                        'directory, N directories deep, in '
+                                        'bugs.d/ in the git directory, with '
+                                        'a manifest. Later updates keep the '
+                                        'layout. 0 goes back to a single '
+                                        'bugs file'))
+        updateParser.add_argument("--staged", action="store_true",
+                                  default=False,
+                                  help=('Only scan the files staged in the '
+                                        'index that differ from HEAD, and '
+                                        'merge their bugs into the existing '
+                                        'bugs file. Fast enough for a '
+                                        'pre-commit hook'))
+        updateParser.add_argument("--recurse-submodules", nargs='?',
+                                  const='separate',
+                                  choices=('separate', 'merged'),
+                                  help=('Also update the submodules that are '
+                                        'checked out, concurrently, each with '
+                                        'its own ignore rules and cache:\n'
+                                        '  * separate: In their own bugs file '
+                                        '(default)\n'
+                                        '  * merged:   In the bugs file of '
+                                        'this repository'))
+        updateParser.add_argument("--stats", action="store_true",
+                                  default=False,
+                                  help=('Print the time spent in each phase, '
+                                        'counters and the slowest files to '
+                                        'stderr. Also enabled by setting '
+                                        'BUGS_STATS'))
+        updateParser.add_argument("--profile", type=str, metavar='FILE',
+                                  help=('Write a cProfile profile of the run '
+                                        'to FILE, which can be read with '
+                                        'pstats. Also enabled by setting '
+                                        'BUGS_PROFILE to FILE'))
+        watchParser = subparsers.add_parser('watch',
+                                            help=('Keep the list of bugs for '
+                                                  'this repository up to date '
+                                                  'as files change'))
+        BugTracker.addScanArguments(watchParser)
+        watchParser.add_argument("--debounce", type=float, default=0.25,
+                                 metavar='SECONDS',
+                                 help=('Wait until no file changed for this '
+                                       'long before updating the bugs file'))
+        printParser = subparsers.add_parser('print',
+                                            help=('Print the list of bugs for '
+                                                  'this repository'))
+        printParser.add_argument("path", nargs='?',
+                                 help='Only print the bugs in this directory')
+        printParser.add_argument("--tag", "-t", type=str,
+                                 help='Only print the bugs with this tag')
+        printParser.add_argument("--grep", "-g", type=str,
+                                 help=('Only print the bugs containing this '
+                                       'text, ignoring case'))
+        printParser.add_argument("--rev", type=str, metavar='COMMIT',
+                                 help=('Print the bugs in the files of this '
+                                       'commit, instead of the bugs file'))
+        historyParser = subparsers.add_parser('history',
+                                              help=('Print when each bug '
+                                                    'appeared, and its age'))
+        historyParser.add_argument("--rev", type=str, default='HEAD',
+                                   metavar='COMMIT',
+                                   help=('Follow the history of this commit '
+                                         '(default: HEAD)'))
+        historyParser.add_argument("--all", action="store_true",
+                                   default=False,
+                                   help=('Also print the bugs that have been '
+                                         'removed, and when'))
+        BugTracker.addTagsArgument(historyParser)
+        daemonParser = subparsers.add_parser('daemon',
+                                             help=('Serve print and update '
+                                                   'from a resident process'))
+        daemonParser.add_argument("--stop", action="store_true",
+                                  default=False,
+                                  help='Stop the running daemon')
         return parser.parse_args(args)
 
+    @staticmethod
+    def addScanArguments(parser):
+        """Add the options controlling how files are scanned to parser."""
+        parser.add_argument("-j", "--jobs", type=int, default=1,
+                            help=('Scan files in this many processes. Use 0 '
+                                  'for one per CPU'))
+        parser.add_argument("--max-file-size", type=int,
+                            default=8 * 1024 * 1024, metavar='BYTES',
+                            help=('Skip files larger than this. Use 0 for no '
+                                  'limit'))
+        parser.add_argument("-u", "--untracked", action="store_true",
+                            default=False, help=('Also scan the files that '
+                                                 'are not tracked by git, '
+                                                 'unless they are ignored'))
+        parser.add_argument("--include-generated", action="store_true",
+                            default=False, help=('Also scan minified and '
+                                                 'generated files'))
+        BugTracker.addTagsArgument(parser)
+
+    @staticmethod
+    def addTagsArgument(parser):
+        """Add the option selecting the tags to look for to parser."""
+        from BugScanner import BugScanner
+        parser.add_argument("--tags", type=str,
+                            default=','.join(BugScanner.defaultTags),
+                            help=('Comma separated list of the tags to look '
+                                  'for, e.g. {}'.format(
+                                      ','.join(BugScanner.knownTags))))
+
+    def getScanOptions(self):
+        """INTERNAL. Return the keyword arguments of Bugs.update."""
+        from BugScanner import BugScanner
+        from FileSniffer import FileSniffer
+        return {
+            'jobs': self.args['jobs'] or os.cpu_count() or 1,
+            'scanner': BugScanner(
+                [tag for tag in self.args['tags'].split(',') if tag],
+                FileSniffer(self.args['max_file_size'],
+                            not self.args['include_generated'])),
+            'untracked': self.args['untracked'],
+        }
+
     def run(self):
         """Perform the function of the program."""
+        profile = self.args.get('profile') or os.environ.get('BUGS_PROFILE')
+        if not profile:
+            return self.runCommand()
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(self.runCommand)
+        finally:
+            profiler.dump_stats(profile)
+
+    def runCommand(self):
+        """INTERNAL. Run the subcommand."""
+        from FileTreeExceptions import NotAValidFileTreeRootException
+        from RepositoryExceptions import InvalidObjectException, \
+            UnknownRevisionException
+        if self.bugs.bare and self.args['function'] in ('update', 'watch') \
+           and not self.args.get('rev'):
+            print('fatal: this operation must be run in a work tree',
+                  file=sys.stderr)
+            return 1
+        if self.args.get('rev') and self.args['function'] == 'update' \
+           and (self.args['untracked'] or self.args['recurse_submodules']):
+            print('fatal: --rev cannot be used with --untracked or '
+                  '--recurse-submodules', file=sys.stderr)
+            return 1
+        if self.args.get('stdout') and (self.args['rev'] or self.args['staged']
+                                        or self.args['recurse_submodules']
+                                        or self.args['shard_depth']
+                                        is not None):
+            print('fatal: --stdout cannot be used with --rev, --staged, '
+                  '--recurse-submodules or --shard-depth', file=sys.stderr)
+            return 1
+        if self.args.get('staged') and (self.args['rev'] or self.bugs.bare
+                                        or self.args['untracked']
+                                        or self.args['recurse_submodules']):
+            print('fatal: --staged cannot be used with --rev, --untracked or '
+                  '--recurse-submodules, or in a bare repository',
+                  file=sys.stderr)
+            return 1
+        try:
+            return self.runSubcommand()
+        except (InvalidObjectException, NotAValidFileTreeRootException,
+                UnknownRevisionException) as error:
+            print('fatal: ' + str(error), file=sys.stderr)
+            return 1
+
+    def runSubcommand(self):
+        """INTERNAL. Run the subcommand, letting its exceptions through."""
         if self.args['function'] == 'update':
-            self.bugs.update()
+            stats = None
+            if self.args['stats'] or os.environ.get('BUGS_STATS'):
+                from ScanStats import ScanStats
+                stats = ScanStats()
+            if self.args['stdout']:
+                self.bugs.printScan(stats=stats, **self.getScanOptions())
+                if stats is not None:
+                    stats.report()
+                return 0
+            if self.args['staged']:
+                options = self.getScanOptions()
+                self.bugs.updateStaged(options['scanner'], stats,
+                                       self.args['shard_depth'])
+                if stats is not None:
+                    stats.report()
+                return 0
+            self.bugs.update(stats=stats,
+                             submodules=self.args['recurse_submodules'],
+                             revision=self.args['rev'],
+                             shardDepth=self.args['shard_depth'],
+                             **self.getScanOptions())
+            if stats is not None:
+                stats.report()
+        elif self.args['function'] == 'watch':
+            try:
+                self.bugs.watch(self.args['debounce'],
+                                **self.getScanOptions())
+            except KeyboardInterrupt:
+                pass
         elif self.args['function'] == 'print':
-            self.bugs.printBugs()
+            return self.bugs.printBugs(self.args['path'], self.args['tag'],
+                                       self.args['grep'], self.args['rev'])
+        elif self.args['function'] == 'history':
+            from BugScanner import BugScanner
+            return self.bugs.printHistory(
+                self.args['rev'], BugScanner(
+                    [tag for tag in self.args['tags'].split(',') if tag]),
+                self.args['all'])
+        elif self.args['function'] == 'daemon':
+            from functools import partial
+            from BugDaemon import BugDaemon
+            if self.args['stop']:
+                return 0 if BugDaemon.forward({'stop': True}) is not None \
+                    else 1
+            BugDaemon(partial(serveRequest, dict())).serveForever()
         else:
             print('fatal: command not understood')
             return 1
@@ -80,150 +298,1101 @@ class BugTracker:
 class Bugs:
     """Contains the logic of the `b' tool."""
 
-    # Static class members
-    # Matches C/C++ and Bash style comments
-    todoRegex = r'(;;|%|#|/(\*|/))\s*TODO:\s*(.*)'
-    r_todo = re.compile(todoRegex)
-
     def __init__(self, pwd):
         # Locate the root of the git repository, or if we aren't in one.
         self.gitDir = self.findRepositoryRoot(pwd)
-        self.bugDict = None
+        # Paths given on the command line are relative to this directory. The
+        # daemon sets it to the working directory of each of its clients.
+        self.cwd = os.path.abspath(pwd)
+        self.fileTree = None
+        # A resident instance (in the daemon) keeps its state between calls,
+        # checking that it is still valid when it is used again.
+        self.resident = False
+        self.treeSignature = None
+        self.scanCache = None
+        self.metadataDir = None
+        # A bare repository has no work tree, only its bugs file and what
+        # can be read from its object store.
+        self.bare = False
+        if self.gitDir is None:
+            from GitRepository import GitRepository
+            self.gitDir = GitRepository.findBareRepository(pwd)
+            self.metadataDir = self.gitDir
+            self.bare = self.gitDir is not None
+
+    @staticmethod
+    def findRepositoryRoot(pwd):
+        """
+        Determine if `pwd' is inside of a git repository and, if so, return the
+        path of the root directory of the repository. It is relative if `pwd'
+        is. Lookups are remembered, so they are cheap for the daemon.
+        """
+        from RepositoryLocator import RepositoryLocator
+        pwd = os.fspath(pwd)
+        root = RepositoryLocator.findRoot(pwd)
+        if root is None or os.path.isabs(pwd):
+            return root
+        return os.path.relpath(root)
 
-    def synchronizeBugDict(self, delete=False):
-        """Initializes t.py's TaskDict object with the current state."""
-        if delete:
-            # Remove the bugs file if it exists
+    def getMetadataDir(self):
+        """
+        INTERNAL. Return the git directory of the repository: its .git
+        directory, or the directory its .git file points to.
+        """
+        if self.metadataDir is None:
+            from FileTreeExceptions import NotAValidFileTreeRootException
+            from GitRepository import GitRepository
+            self.metadataDir = GitRepository.findGitDir(self.gitDir)
+            if self.metadataDir is None:
+                # Like a .git file pointing to a directory that is gone
+                raise NotAValidFileTreeRootException(
+                    'not a git repository: ' + os.path.join(
+                        os.path.abspath(self.gitDir), '.git'))
+        return self.metadataDir
+
+    def getFileTree(self):
+        """INTERNAL. Return the BugFileTree rooted at gitDir."""
+        if self.resident and self.fileTree is not None \
+           and self.treeSignature != self.getTreeSignature():
+            self.fileTree = None
+        if self.fileTree is None:
+            from BugFileTree import BugFileTree
+            self.fileTree = BugFileTree(self.gitDir)
+            if self.resident:
+                self.treeSignature = self.getTreeSignature()
+        return self.fileTree
+
+    def getTreeSignature(self):
+        """
+        INTERNAL. Return the stat data of the files the file list depends on:
+        the index and the ignore files that have been read so far.
+        """
+        from GitRepository import GitRepository
+        metadataDir = self.getMetadataDir()
+        paths = [GitRepository.findIndexFile(self.gitDir, metadataDir),
+                 os.path.join(GitRepository.findCommonDir(metadataDir), 'info',
+                              'exclude'),
+                 os.path.join(self.gitDir, '.bignore')]
+        if self.fileTree is not None:
+            ignoreMatcher = self.fileTree.getIgnoreMatcher()
+            paths.extend(os.path.join(self.gitDir, directory, '.gitignore')
+                         for directory, rules in ignoreMatcher.layers.items()
+                         if rules is not None or directory == '')
+        signature = list()
+        for path in paths:
             try:
-                os.unlink(self.gitDir + '/bugs')
-            except FileNotFoundError:
-                pass
+                statResult = os.stat(path)
+                signature.append((path, statResult.st_mtime_ns,
+                                  statResult.st_size, statResult.st_ino))
+            except OSError:
+                signature.append((path, None))
+        return signature
+
+    def buildFileList(self, untracked=False, stats=None):
+        """
+        INTERNAL. Builds the list of files to search for TODO comments. The
+        paths are relative to the root of the repository, and start with './'
+        The files tracked in the index of the repository are used when it can
+        be read, along with the untracked files that are not ignored if
+        `untracked' is True. Otherwise, the working tree is walked. The time
+        spent and the files visited are recorded in the ScanStats `stats'.
+        """
+        return list(self.iterateFiles(untracked, stats))
 
-        # Initialize the TaskDict object
-        self.bugDict = t.TaskDict(taskdir=self.gitDir, name='bugs')
+    def iterateFiles(self, untracked=False, stats=None):
+        """
+        INTERNAL. Yield the files buildFileList lists, as they are found. The
+        working tree is only walked as the paths are consumed, so the files
+        found first can be scanned while the walk goes on.
+        """
+        from ScanStats import ScanStats
+        stats = stats or ScanStats(enabled=False)
+        with stats.phase('ignore rules'):
+            fileTree = self.getFileTree()
+            ignoreMatcher = fileTree.getIgnoreMatcher()
+        with stats.phase('index'):
+            tracked = fileTree.repository.getTrackedFiles()
+            validPaths = list()
+            if tracked is not None:
+                # Interned, so the file list, the results of the scan and the
+                # scan cache share one copy of each path
+                validPaths.extend(sys.intern('./' + path) for path in tracked
+                                  if not ignoreMatcher.isIgnored(path))
+                stats.count('files tracked', len(tracked))
+                stats.count('files ignored', len(tracked) - len(validPaths))
+        yield from validPaths
+        if tracked is not None and not untracked:
+            return
+
+        # Walk the repository. Ignored directories are pruned by the walker.
+        prefixLength = len(fileTree.getRootNode().getPath()) + 1
+        trackedPaths = set(validPaths)
+        del validPaths, tracked
+        walker = fileTree.walk()
+        while True:
+            start = time.perf_counter()
+            node = next(walker, None)
+            stats.addTime('walk', time.perf_counter() - start)
+            if node is None:
+                break
+            if not node.isDirectory():
+                relative = node.getPath()[prefixLength:]
+                path = sys.intern('./' + relative.replace(os.sep, '/'))
+                if path not in trackedPaths:
+                    stats.count('files untracked')
+                    yield path
+
+    def update(self, jobs=1, scanner=None, untracked=False, stats=None,
+               submodules=None, revision=None, shardDepth=None):
+        """
+        Update the bugs file in the gitDir directory. When `jobs' is greater
+        than one, files are scanned in that many worker processes. Files are
+        scanned by the BugScanner `scanner', or one looking for TODOs if it is
+        None. Untracked files are only scanned if `untracked' is True. The
+        time spent in each phase is recorded in the ScanStats `stats'.
+        `submodules' is None to leave the submodules alone, 'separate' to also
+        update the bugs file of each of them, or 'merged' to list their bugs in
+        the bugs file of this repository. If `revision' is given, the files of
+        that commit are read from the object store instead of the working
+        tree. `shardDepth' is the layout of the bugs file, as for writeBugs.
+        """
+        from BugScanner import BugScanner
+        scanner = scanner or BugScanner()
+        if revision is not None:
+            fileList, results = self.scanRevision(revision, scanner, stats)
+            self.commitScan(None, fileList, results, stats, shardDepth)
+            return
+        fileList, results, cache = self.scan(jobs, scanner, untracked, stats,
+                                             submodules)
+        self.commitScan(cache, fileList, results, stats, shardDepth)
+
+    def updateStaged(self, scanner=None, stats=None, shardDepth=None):
+        """
+        Scan the files whose blob staged in the index differs from HEAD, and
+        merge their bugs into the bug database and the bugs file. The other
+        files are neither read nor scanned, so the results of the last update
+        are kept for them. Without a bug database to merge into, the whole
+        working tree is updated instead. `shardDepth' is the layout of the
+        bugs file, as for writeBugs.
+        """
+        from BlobCache import BlobCache
+        from BugScanner import BugScanner
+        from RepositoryExceptions import UnknownRevisionException
+        from ScanStats import ScanStats
+        from SqliteBugDAO import SqliteBugDAO
+        scanner = scanner or BugScanner()
+        stats = stats or ScanStats(enabled=False)
+        if not os.path.isfile(self.getDatabaseFilename()):
+            self.update(scanner=scanner, stats=stats, shardDepth=shardDepth)
+            return
+        fileTree = self.getFileTree()
+        store = self.openObjectStore()
+        try:
+            with stats.phase('read index'):
+                try:
+                    head = store.getTree(store.resolveRevision('HEAD'))
+                except UnknownRevisionException:
+                    head = None # Nothing has been committed yet
+                changes = fileTree.repository.diffIndex(store, head)
+            stats.count('files staged', len(changes))
+            ignoreMatcher = fileTree.getIgnoreMatcher()
+            results = dict()
+            blobCache = BlobCache(BlobCache.getDefaultFilename(),
+                                  scanner.getSignature())
+            try:
+                with stats.phase('scan'):
+                    for path, sha in changes.items():
+                        fn = './' + path
+                        results[fn] = []
+                        if sha is None or ignoreMatcher.isIgnored(path):
+                            continue
+                        bugs = self.scanBlob(store, sha, fn, scanner,
+                                             blobCache, stats)
+                        if bugs is None:
+                            printWarning('Could not decode file "{}"'.format(
+                                fn))
+                            continue
+                        results[fn] = bugs
+            finally:
+                blobCache.close()
+        finally:
+            store.close()
+        stats.count('bugs found', sum(len(bugs) for bugs in results.values()))
+        bugDAO = SqliteBugDAO(self.getDatabaseFilename())
+        try:
+            with stats.phase('write database'):
+                bugDAO.update(results)
+                merged = dict()
+                for path, tag, priority, text in bugDAO.query():
+                    merged.setdefault(path, []).append([tag, priority, text])
+        finally:
+            bugDAO.close()
+        with stats.phase('write bugs file'):
+            self.writeBugs(sorted(merged), merged, shardDepth)
+
+    def scan(self, jobs, scanner, untracked, stats=None, submodules=None):
+        """
+        INTERNAL. Scan the files of the repository, and its submodules as
+        requested by `submodules'. Each submodule is scanned with its own
+        ignore rules and caches, by one of up to `jobs' worker processes
+        running alongside the scan of this repository. Return the file list,
+        a dict mapping the files holding bugs to them, and the ScanCache of
+        this repository.
+        """
+        submodulePaths = self.getFileTree().repository.getSubmodules() \
+            if submodules else []
+        executor = None
+        futures = list()
+        if submodulePaths:
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(
+                max_workers=max(1, min(jobs, len(submodulePaths))))
+        try:
+            for path in submodulePaths:
+                futures.append((path, executor.submit(
+                    updateSubmodule, os.path.join(self.gitDir, path), scanner,
+                    untracked, submodules)))
+            # Only files that changed since the last update are read again,
+            # and only if their contents have never been seen in any
+            # repository. They are scanned as the walk finds them, and only
+            # the files holding bugs are kept.
+            cache, blobCache = self.openCaches(scanner)
+            fileList = list()
+            results = dict()
+            try:
+                for fn, bugs in self.iterateScan(
+                        cache, self.collectFiles(fileList, untracked, stats),
+                        jobs, scanner, blobCache, stats):
+                    if bugs:
+                        results[fn] = bugs
+            finally:
+                blobCache.close()
+            for path, future in futures:
+                try:
+                    scanned = future.result()
+                except Exception as error: #pylint: disable=broad-except
+                    printWarning('Could not update submodule "{}": {}'.format(
+                        path, error))
+                    continue
+                if scanned is None:
+                    continue # The submodule has its own bugs file
+                # Make the paths relative to the root of this repository
+                for fn in scanned[0]:
+                    fileList.append('./' + path + '/' + fn[2:])
+                for fn, bugs in scanned[1].items():
+                    results['./' + path + '/' + fn[2:]] = bugs
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return fileList, results, cache
+
+    def collectFiles(self, fileList, untracked, stats=None):
+        """
+        INTERNAL. Yield the files of iterateFiles, appending them to
+        `fileList' as they go by.
+        """
+        for fn in self.iterateFiles(untracked, stats):
+            fileList.append(fn)
+            yield fn
+
+    def printScan(self, jobs=1, scanner=None, untracked=False, stats=None):
+        """
+        Print the bugs of the repository as they are found, in the format of
+        print, without touching the bugs file or the bug database. Files are
+        scanned while the walk is still going on, so the first bugs show up
+        quickly even on a slow filesystem. The scan cache is still updated.
+        """
+        from BugScanner import BugScanner
+        scanner = scanner or BugScanner()
+        cache, blobCache = self.openCaches(scanner)
+        fileList = list()
+        try:
+            for fn, bugs in self.iterateScan(
+                    cache, self.collectFiles(fileList, untracked, stats),
+                    jobs, scanner, blobCache, stats):
+                if bugs:
+                    sys.stdout.write(''.join(
+                        fn + ': ' + BugScanner.formatBug(bug) + '\n'
+                        for bug in bugs))
+                    sys.stdout.flush()
+        finally:
+            blobCache.close()
+        cache.prune(fileList)
+        cache.write()
+
+    def scanRevision(self, revision, scanner, stats=None):
+        """
+        INTERNAL. Scan the files of the commit `revision', reading its trees
+        and blobs from the object store. The ignore files are those of the
+        commit. Blobs are looked up in the shared BlobCache first. Return the
+        file list and the results, like scan.
+        """
+        from BlobCache import BlobCache
+        from ScanStats import ScanStats
+        stats = stats or ScanStats(enabled=False)
+        store = self.openObjectStore()
+        try:
+            with stats.phase('read tree'):
+                files = store.listFiles(store.getTree(
+                    store.resolveRevision(revision)))
+            with stats.phase('ignore rules'):
+                ignoreMatcher = self.getTreeIgnoreMatcher(store, files)
+                fileList = ['./' + path for path in files
+                            if not ignoreMatcher.isIgnored(path)]
+            stats.count('files tracked', len(files))
+            stats.count('files ignored', len(files) - len(fileList))
+            results = dict()
+            blobCache = BlobCache(BlobCache.getDefaultFilename(),
+                                  scanner.getSignature())
+            try:
+                with stats.phase('scan'):
+                    for fn in fileList:
+                        bugs = self.scanBlob(store, files[fn[2:]], fn,
+                                             scanner, blobCache, stats)
+                        if bugs is None:
+                            printWarning('Could not decode file "{}"'.format(
+                                fn))
+                            continue
+                        results[fn] = bugs
+            finally:
+                blobCache.close()
+        finally:
+            store.close()
+        stats.count('bugs found', sum(len(bugs) for bugs in results.values()))
+        return fileList, results
+
+    def openObjectStore(self):
+        """INTERNAL. Return a GitObjectStore reading this repository."""
+        from GitObjectStore import GitObjectStore
+        from GitRepository import GitRepository
+        metadataDir = self.getMetadataDir()
+        return GitObjectStore(metadataDir,
+                              GitRepository.findCommonDir(metadataDir))
+
+    def getTreeIgnoreMatcher(self, store, files):
+        """
+        INTERNAL. Return an IgnoreMatcher applying the ignore files found in
+        `files', a dict mapping the paths of the files of a commit to the SHAs
+        of their blobs in the GitObjectStore `store'.
+        """
+        from GitRepository import GitRepository
+        from IgnoreMatcher import IgnoreMatcher
+        from RepositoryExceptions import InvalidObjectException
+        def readIgnoreFile(path):
+            if path not in files:
+                return []
+            try:
+                return store.readObject(files[path])[1].decode().splitlines()
+            except (InvalidObjectException, UnicodeDecodeError):
+                return []
+        commonDir = GitRepository.findCommonDir(self.getMetadataDir())
+        return IgnoreMatcher(self.gitDir, excludeFile=os.path.join(
+            commonDir, 'info', 'exclude'), reader=readIgnoreFile)
 
     @staticmethod
-    def findRepositoryRoot(pwd):
+    def scanBlob(store, sha, fileName, scanner, blobCache, stats=None):
         """
-        Determine if `pwd' is inside of a git repository and, if so, return the
-        path of the root directory of the repository.
-        """
-        gitHere = Path(os.fspath(pwd) + '/.git')
-        rootDir = os.path.abspath(os.sep) # Platform independent
-        while os.path.abspath(pwd) != rootDir:
-            if gitHere.is_dir():
-                return str(pwd)
-            pwd = Path(os.fspath(pwd) + '/..')
-            gitHere = Path(os.fspath(pwd) + '/.git')
-        return None
+        INTERNAL. Return the list of bugs in the blob `sha' of the
+        GitObjectStore `store', the contents of `fileName', or None if it
+        cannot be decoded. The result is looked up in and saved to
+        `blobCache'.
+        """
+        from ScanStats import ScanStats
+        stats = stats or ScanStats(enabled=False)
+        syntax = scanner.getSyntaxName(fileName)
+        bugs = blobCache.lookup(sha, syntax)
+        if bugs is not None:
+            stats.count('files in blob cache')
+            return bugs
+        contents = store.readObject(sha)[1]
+        stats.count('files scanned')
+        stats.count('bytes read', len(contents))
+        try:
+            bugs = scanner.scanContents(contents, fileName)
+        except UnicodeDecodeError:
+            stats.count('files undecodable')
+            return None
+        if not scanner.sniffer.isGeneratedName(fileName):
+            blobCache.store(sha, syntax, bugs)
+        return bugs
+
+    def printHistory(self, revision='HEAD', scanner=None,
+                     includeRemoved=False):
+        """
+        Bring the history of the bugs up to date with the commit `revision',
+        then print when each bug still present appeared and its age in days,
+        oldest first. The bugs that have been removed are also printed, with
+        the date they were removed, if `includeRemoved' is True.
+        """
+        import hashlib
+        from BlobCache import BlobCache
+        from BugHistory import BugHistory
+        from BugScanner import BugScanner
+        scanner = scanner or BugScanner()
+        store = self.openObjectStore()
+        try:
+            head = store.resolveRevision(revision)
+            files = store.listFiles(store.getTree(head))
+            # The ignore rules of the commit apply to the whole history, so a
+            # change of the rules is seen as a change of the settings.
+            ignoreMatcher = self.getTreeIgnoreMatcher(store, files)
+            ignoreFiles = [sha for path, sha in files.items()
+                           if path == '.bignore'
+                           or path.rsplit('/', 1)[-1] == '.gitignore']
+            signature = scanner.getSignature() + ' ignore=' + hashlib.sha1(
+                ' '.join(ignoreFiles).encode()).hexdigest()
+            blobCache = BlobCache(BlobCache.getDefaultFilename(),
+                                  scanner.getSignature())
+            def getBugs(path, sha):
+                if ignoreMatcher.isIgnored(path):
+                    return None
+                return self.scanBlob(store, sha, path, scanner, blobCache)
+            history = BugHistory(self.getHistoryFilename())
+            try:
+                history.update(store, head, getBugs, signature)
+                # Streamed from the database, one bug at a time
+                self.printHistoryRows(history.query(includeRemoved))
+            finally:
+                history.close()
+                blobCache.close()
+        finally:
+            store.close()
+        return 0
 
     @staticmethod
-    def readIgnoreFile(ignoreFilename):
-        """INTERNAL. Read ignoreFilename file for the list of regexes."""
+    def printHistoryRows(rows):
+        """
+        INTERNAL. Print the rows of BugHistory.query, with the dates each bug
+        was introduced and removed, and its age in days.
+        """
+        from BugScanner import BugScanner
+        now = time.time()
+        for path, tag, priority, text, _, introducedTime, removed, \
+            removedTime in rows:
+            end = removedTime if removed is not None else now
+            print('{}  {}  {:>6}d  ./{}: {}'.format(
+                time.strftime('%Y-%m-%d', time.localtime(introducedTime)),
+                time.strftime('%Y-%m-%d', time.localtime(removedTime))
+                if removed is not None else ' ' * 10,
+                int((end - introducedTime) // 86400), path,
+                BugScanner.formatBug([tag, priority, text])))
+
+    def watch(self, debounce=0.25, jobs=1, scanner=None, untracked=False):
+        """
+        Update the bugs file, then keep it up to date until interrupted. Only
+        the files that inotify reports as changed are scanned again, once no
+        change has been seen for `debounce' seconds. The other arguments are
+        those of update.
+        """
+        from BugScanner import BugScanner
+        scanner = scanner or BugScanner()
+        from InotifyWatcher import InotifyWatcher
+        watcher = InotifyWatcher()
+        cache, blobCache = self.openCaches(scanner)
         try:
-            with open(ignoreFilename, 'r') as ignoreFile:
-                return list(filter(('').__ne__,
-                                   [ln.rstrip('\n')
-                                    for ln in ignoreFile.readlines()]))
-        except FileNotFoundError:
-            pass
-
-    def buildFileList(self):
-        """INTERNAL. Builds the list of files to search for TODO comments."""
-        # Automatically ignore .git/ and bugs
-        rejectFilenames = ['.git/', '~']
-        rejectRegexes = []
-        # Read .bignore file, if it exists
-        rejectRegexes.extend(self.readIgnoreFile(self.gitDir + '/.bignore')
-                             or [])
-        # Read .gitignore file, if it exists
-        rejectRegexes.extend(self.readIgnoreFile(self.gitDir + '/.gitignore')
-                             or [])
-
-        # Expand shell-style globs in rejectRegexes
-        for regex in rejectRegexes:
-            if '*' in regex:
-                rejectFilenames.extend(glob('./**/' + regex, recursive=True))
-            else:
-                rejectFilenames.append(regex)
-
-        # Walk the repository
-        validPaths = list()
-        for filename in glob('./**/*', recursive=True):
-            invalid = False
-            for regex in rejectFilenames:
-                if regex in filename or regex == filename \
-                   or Path(filename).is_dir():
-                    invalid = True
-            if not invalid:
-                validPaths.append(filename)
-        return validPaths
-
-    def update(self):
-        """Update the bugs file in the gitDir directory."""
-        # Initialize the BugDict
-        self.synchronizeBugDict(delete=True)
-        # Build the file list
-        fileList = self.buildFileList()
-
-        # Begin looking for bugs
-        for fn in fileList:
+            fileList = self.buildFileList(untracked)
+            results = self.scanFiles(cache, fileList, jobs, scanner,
+                                     blobCache)
+            self.commitScan(cache, fileList, results)
+            blobCache.commit()
+            directories = self.watchDirectories(watcher)
+            while True:
+                changed, refresh = self.collectChanges(watcher, directories,
+                                                       debounce)
+                # New untracked files only show up in a new file list
+                refresh = refresh or (untracked
+                                      and not changed.issubset(fileList))
+                if not changed and not refresh:
+                    continue
+                if refresh:
+                    # The index, an ignore file or the directories changed.
+                    # Rebuild the file list, and scan the files new to it.
+                    self.fileTree = None
+                    newFileList = self.buildFileList(untracked)
+                    changed.update(set(newFileList).difference(fileList))
+                    fileList = newFileList
+                    directories = self.watchDirectories(watcher)
+                    if None in changed:
+                        changed = set(fileList) # Events were lost
+                fileSet = set(fileList)
+                for fn in [fn for fn in results
+                           if fn not in fileSet or fn in changed]:
+                    del results[fn]
+                results.update(self.scanFiles(
+                    cache, [fn for fn in fileList if fn in changed], jobs,
+                    scanner, blobCache))
+                self.commitScan(cache, fileList, results)
+                blobCache.commit()
+        finally:
+            blobCache.close()
+            watcher.close()
+
+    def watchDirectories(self, watcher):
+        """
+        INTERNAL. Watch every directory of the repository that is not ignored,
+        and the .git directory for changes to the index. Return a dict mapping
+        the watch descriptors to the paths of the directories, relative to the
+        root of the repository. The .git directory is mapped to None.
+        """
+        fileTree = self.getFileTree()
+        prefixLength = len(fileTree.getRootNode().getPath()) + 1
+        directories = {watcher.addWatch(self.getMetadataDir(),
+                                        watcher.IN_CLOSE_WRITE
+                                        | watcher.IN_MOVED_TO): None}
+        def addWatch(node):
+            if not node.isDirectory():
+                return
+            relative = node.getPath()[prefixLength:].replace(os.sep, '/')
             try:
-                bugs = self.getBugs(fn) or []
-                for bug in bugs:
-                    # Add the bug to the dictionary
-                    self.bugDict.add_task(fn + ': ' + bug)
-            except UnicodeDecodeError:
-                print((Fore.YELLOW + 'Warning' + Style.RESET_ALL +
-                       ': Could not decode file "{}". If this is a '
-                       'binary file, consider adding it to your '
-                       '.bignore or .gitignore').format(fn), file=sys.stderr)
+                directories[watcher.addWatch(node.getPath())] = relative
+            except OSError as error:
+                printWarning('Could not watch "{}": {}'.format(
+                    node.getPath(), error.strerror))
+        fileTree.searchTopDown(addWatch)
+        return directories
+
+    @staticmethod
+    def collectChanges(watcher, directories, debounce):
+        """
+        INTERNAL. Wait for changes to the files of the repository, until none
+        arrived for `debounce' seconds. Return the set of the paths of the
+        files that changed, and whether the file list must be rebuilt. The set
+        contains None if some events were lost.
+        """
+        changed = set()
+        refresh = False
+        # Until a significant event arrived, wait for as long as it takes
+        timeout = None
+        deadline = None
+        while True:
+            events = watcher.readEvents(timeout)
+            if not events and timeout is not None:
+                break
+            for event in events:
+                if event.mask & watcher.IN_Q_OVERFLOW:
+                    changed.add(None)
+                    refresh = True
+                    continue
+                if event.wd not in directories:
+                    continue
+                directory = directories[event.wd]
+                if event.mask & watcher.IN_IGNORED:
+                    del directories[event.wd] # The directory was removed
+                elif directory is None:
+                    # Only the index matters in the git directory, where the
+                    # bugs file, the caches and the database are written too.
+                    refresh = refresh or event.name == 'index'
+                elif event.mask & watcher.IN_ISDIR:
+                    refresh = True
+                elif event.name and not (directory == ''
+                                         and Bugs.isOwnOutput(event.name)):
+                    refresh = refresh or event.name in ('.gitignore',
+                                                        '.bignore')
+                    changed.add('./' + (directory + '/' + event.name
+                                        if directory else event.name))
+            if not changed and not refresh:
                 continue
+            # Editors that save continuously must not delay the update forever
+            if deadline is None:
+                deadline = time.monotonic() + 10 * debounce
+            timeout = min(debounce, max(0, deadline - time.monotonic()))
+            if timeout <= 0:
+                break
+        return changed, refresh
+
+    @staticmethod
+    def isOwnOutput(name):
+        """
+        INTERNAL. Return True if name, in the root of the repository, is the
+        bugs file or one of the temporary files it is written through.
+        """
+        return name == 'bugs' \
+            or (name.startswith('.bugs-') and name.endswith('.tmp'))
+
+    def openCaches(self, scanner):
+        """INTERNAL. Return the ScanCache and the BlobCache to scan with."""
+        from BlobCache import BlobCache
+        from ScanCache import ScanCache
+        signature = scanner.getSignature()
+        cache = self.scanCache
+        if cache is None or cache.signature != signature:
+            cache = ScanCache(self.getCacheFilename(), signature)
+            if self.resident:
+                self.scanCache = cache
+        return cache, BlobCache(BlobCache.getDefaultFilename(), signature)
 
-        # Finally, write the changes to disk
-        self.bugDict.write(delete_if_empty=True)
+    def commitScan(self, cache, fileList, results, stats=None,
+                   shardDepth=None):
+        """
+        INTERNAL. Save the scan cache, unless `cache' is None, and write the
+        bugs of the files in `fileList' found in `results' to the bugs file,
+        laid out as `shardDepth' says.
+        """
+        from ScanStats import ScanStats
+        stats = stats or ScanStats(enabled=False)
+        if cache is not None:
+            with stats.phase('write cache'):
+                # Forget about the files that have been deleted or are now
+                # ignored
+                cache.prune(fileList)
+                cache.write()
+        with stats.phase('write bugs file'):
+            self.writeBugs(fileList, results, shardDepth)
+        with stats.phase('write database'):
+            self.writeDatabase(fileList, results)
+
+    def writeDatabase(self, fileList, results):
+        """
+        INTERNAL. Update the bug database with the bugs of the files in
+        `fileList' found in `results'. Only the rows of the files whose bugs
+        changed are rewritten.
+        """
+        from SqliteBugDAO import SqliteBugDAO
+        files = {fn: results[fn] for fn in fileList if results.get(fn)}
+        bugDAO = SqliteBugDAO(self.getDatabaseFilename())
+        try:
+            bugDAO.synchronize(files)
+        finally:
+            bugDAO.close()
+
+    def writeBugs(self, fileList, results, shardDepth=None):
+        """
+        INTERNAL. Replace the bugs file with the bugs of the files in
+        `fileList' found in `results', in the format of t. The file is
+        written in the git directory and renamed into place, so readers never
+        see a partial file, and it is left alone if its contents would not
+        change. If `shardDepth' is greater than 0, the bugs are written to the
+        shards of a BugShardIndex that deep instead, and only the shards that
+        changed are rewritten. If it is None, the current layout is kept.
+        """
+        from BugFileWriter import BugFileWriter
+        from BugScanner import BugScanner
+        from BugShardIndex import BugShardIndex
+        tasks = ((fn, fn + ': ' + BugScanner.formatBug(bug))
+                 for fn in fileList for bug in results.get(fn) or [])
+        shardDir = self.getShardDirectory()
+        index = BugShardIndex.load(shardDir, self.getMetadataDir())
+        if shardDepth is None:
+            shardDepth = index.depth if index is not None else 0
+        if shardDepth > 0:
+            if index is None or index.depth != shardDepth:
+                index = BugShardIndex(shardDir, shardDepth,
+                                      self.getMetadataDir())
+            index.write(tasks)
+            try:
+                os.unlink(os.path.join(self.gitDir, 'bugs'))
+            except FileNotFoundError:
+                pass
+            return
+        if index is not None:
+            index.remove()
+        BugFileWriter(os.path.join(self.gitDir, 'bugs'),
+                      self.getMetadataDir()).writeTasks(
+                          text for _, text in tasks)
+
+    def getShardDirectory(self):
+        """
+        INTERNAL. Return the directory of the shards of the bugs file. It is
+        kept in the git directory, so it never clashes with the files of the
+        working tree.
+        """
+        return os.path.join(self.getMetadataDir(), 'bugs.d')
+
+    def getCacheFilename(self):
+        """INTERNAL. Return the path of the scan cache of this repository."""
+        return os.path.join(self.getMetadataDir(), 'bugs-cache.json')
+
+    def getHistoryFilename(self):
+        """INTERNAL. Return the path of the bug history of this repository."""
+        return os.path.join(self.getMetadataDir(), 'bugs-history.sqlite')
+
+    def getDatabaseFilename(self):
+        """INTERNAL. Return the path of the bug database of this repository."""
+        return os.path.join(self.getMetadataDir(), 'bugs.sqlite')
+
+    def scanFiles(self, cache, fileList, jobs=1, scanner=None, blobCache=None,
+                  stats=None):
+        """
+        INTERNAL. Return a dict mapping each file in `fileList' to the list of
+        bugs in it, or to None if it could not be decoded, in which case a
+        warning is printed. Files that no longer exist are left out. See
+        iterateScan.
+        """
+        return dict(self.iterateScan(cache, fileList, jobs, scanner,
+                                     blobCache, stats))
+
+    # Files handed to a worker at once, to amortize the overhead of the
+    # executor, and batches in flight per worker. The files waiting to be
+    # scanned are bounded by their product, whatever the size of the tree.
+    scanBatchSize = 32
+    scanBatchesPerWorker = 4
+    # Without worker processes, files are still read by this many threads, so
+    # waiting on the filesystem overlaps with matching.
+    readerThreads = 2
+
+    def iterateScan(self, cache, files, jobs=1, scanner=None, blobCache=None,
+                    stats=None):
+        """
+        INTERNAL. Yield a (file, bugs) tuple for each file of the iterable
+        `files' that exists, as soon as its bugs are known. bugs is None if
+        the file could not be decoded, in which case a warning is printed.
+        Only files whose stat data does not match their entry in `cache' are
+        considered. Of those, files known to match a blob of the index are
+        looked up in `blobCache', and the rest are read by `scanner', in
+        batches handed to `jobs' worker processes, or to reader threads. Only
+        a bounded number of batches are in flight, so `files' is consumed as
+        fast as the scan goes. Counters and the time spent reading each file
+        are recorded in the ScanStats `stats'.
+        """
+        from collections import deque
+        from BugScanner import BugScanner
+        from ScanStats import ScanStats
+        stats = stats or ScanStats(enabled=False)
+        scanner = scanner or BugScanner()
+        repository = self.getFileTree().repository
+        with stats.phase('cache lookup'):
+            indexEntries = repository.getIndexEntries() \
+                if blobCache is not None else dict()
+        if jobs > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(max_workers=jobs)
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+            executor = ThreadPoolExecutor(max_workers=self.readerThreads)
+        window = max(jobs, self.readerThreads) * self.scanBatchesPerWorker
+        pending = deque()
+        batch = list()
+        bugCount = 0
+        try:
+            for fn in files:
+                start = time.perf_counter()
+                bugs, staleFile = self.lookupFile(cache, fn, repository,
+                                                  indexEntries, scanner,
+                                                  blobCache, stats)
+                stats.addTime('cache lookup', time.perf_counter() - start)
+                if staleFile is None:
+                    if bugs is not None:
+                        bugCount += len(bugs)
+                        yield fn, bugs
+                    continue
+                batch.append(staleFile)
+                if len(batch) < self.scanBatchSize:
+                    continue
+                pending.append((batch, executor.submit(
+                    scanBatch, [os.path.join(self.gitDir, staleFile[0])
+                                for staleFile in batch], scanner)))
+                batch = list()
+                while len(pending) >= window:
+                    for fn, bugs in self.collectBatch(*pending.popleft(),
+                                                      cache, scanner,
+                                                      blobCache, stats):
+                        bugCount += len(bugs or [])
+                        yield fn, bugs
+            if batch:
+                pending.append((batch, executor.submit(
+                    scanBatch, [os.path.join(self.gitDir, staleFile[0])
+                                for staleFile in batch], scanner)))
+            while pending:
+                for fn, bugs in self.collectBatch(*pending.popleft(), cache,
+                                                  scanner, blobCache, stats):
+                    bugCount += len(bugs or [])
+                    yield fn, bugs
+        finally:
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown()
+        stats.count('bugs found', bugCount)
+
+    def lookupFile(self, cache, fn, repository, indexEntries, scanner,
+                   blobCache, stats):
+        """
+        INTERNAL. Look the file `fn' up in the caches of iterateScan. Return
+        its bugs and None if they are cached, or None and the tuple of its
+        name, stat data and blob SHA, if it is known, if it has to be scanned.
+        Return None and None if it does not exist.
+        """
+        # Stat before reading, so a write racing with the scan is seen as a
+        # change the next time around.
+        try:
+            statResult = os.stat(os.path.join(self.gitDir, fn))
+        except OSError:
+            # Broken symbolic links, files removed under us, etc.
+            stats.count('files missing')
+            return None, None
+        bugs = cache.lookup(fn, statResult)
+        if bugs is not None:
+            stats.count('files in scan cache')
+            return bugs, None
+        sha = None
+        entry = indexEntries.get(fn[2:])
+        if entry is not None and repository.isUnchanged(entry, statResult):
+            sha = entry.sha
+            bugs = blobCache.lookup(sha, scanner.getSyntaxName(fn))
+            if bugs is not None:
+                bugs = cache.store(fn, statResult, bugs)
+                stats.count('files in blob cache')
+                return bugs, None
+        stats.count('files scanned')
+        stats.count('bytes read', statResult.st_size)
+        return None, (fn, statResult, sha)
 
     @staticmethod
-    def getBugs(fileName):
-        """Get a list of bugs in the file `fileName'"""
-        bugs = list()
-        with open(fileName, 'r') as inputFile:
-            for line in inputFile.readlines():
-                # Attempt to match the regex.
-                bug = Bugs.r_todo.search(line)
-                if bug is not None:
-                    # If we are matching C style comments, remove the ' */'
-                    if bug.group(2) == '*' and bug.group(3)[-3:] == ' */':
-                        bugs.append(bug.group(3)[:-3])
-                    else:
-                        bugs.append(bug.group(3))
-        return bugs
+    def collectBatch(batch, future, cache, scanner, blobCache, stats):
+        """
+        INTERNAL. Wait for the results of a batch of iterateScan, save them
+        to the caches, and yield them.
+        """
+        start = time.perf_counter()
+        scanned = future.result()
+        stats.addTime('scan', time.perf_counter() - start)
+        for (fn, statResult, sha), (bugs, seconds) in zip(batch, scanned):
+            stats.recordFile(fn, seconds)
+            if bugs is None:
+                stats.count('files undecodable')
+                printWarning('Could not decode file "{}". If this is a binary '
+                             'file, consider adding it to your .bignore or '
+                             '.gitignore'.format(fn))
+                yield fn, None
+                continue
+            # Skipping a file because of its name says nothing of its contents
+            if sha is not None and not scanner.sniffer.isGeneratedName(fn):
+                blobCache.store(sha, scanner.getSyntaxName(fn), bugs)
+            yield fn, cache.store(fn, statResult, bugs)
 
-    def printBugs(self):
-        """Print the bugs in the bugs file"""
-        # Initialize the bugDict object
-        self.synchronizeBugDict()
-        # Print the list of bugs
-        self.bugDict.print_list(quiet=True)
+    @staticmethod
+    def tryGetBugs(fileName, scanner=None):
+        """
+        INTERNAL. Like getBugs, but returns None instead of raising when
+        `fileName' cannot be decoded, so it can be used from worker processes.
+        """
+        try:
+            return Bugs.getBugs(fileName, scanner) or []
+        except UnicodeDecodeError:
+            return None
+
+    @staticmethod
+    def timeGetBugs(fileName, scanner=None):
+        """
+        INTERNAL. Like tryGetBugs, but returns a tuple of the bugs and of the
+        time it took to read the file, in seconds.
+        """
+        start = time.perf_counter()
+        bugs = Bugs.tryGetBugs(fileName, scanner)
+        return bugs, time.perf_counter() - start
+
+    @staticmethod
+    def getBugs(fileName, scanner=None):
+        """
+        Get a list of bugs in the file `fileName', as [tag, priority, text]
+        lists, using the BugScanner `scanner' or one looking for TODOs.
+        """
+        from BugScanner import BugScanner
+        return (scanner or BugScanner()).scanFile(fileName)
+
+    def printBugs(self, path=None, tag=None, text=None, revision=None):
+        """
+        Print the bugs in the bugs file. If any of `path', `tag' or `text' are
+        given, only print the bugs in the files under `path', with the tag
+        `tag' and containing `text', answering from the bug database. If
+        `revision' is given, the bugs in the files of that commit are printed
+        instead.
+        """
+        if self.gitDir is None:
+            print('fatal: not a git repository', file=sys.stderr)
+            return 1
+        if tag is None and text is None and revision is None \
+           and os.path.isdir(self.getShardDirectory()):
+            return self.printShards(path)
+        if path is None and tag is None and text is None and revision is None:
+            return self.printBugsFile()
+
+        import hashlib
+        from BugScanner import BugScanner
+        prefix = self.getPathPrefix(path) if path else None
+        if revision is not None:
+            fileList, results = self.scanRevision(revision, BugScanner())
+            bugs = [(fn, bugTag, priority, bugText) for fn in fileList
+                    if not prefix or fn.startswith(prefix)
+                    for bugTag, priority, bugText in results.get(fn) or []
+                    if (not tag or bugTag == tag)
+                    and (not text or text.lower() in bugText.lower())]
+        else:
+            from SqliteBugDAO import SqliteBugDAO
+            if not os.path.isfile(self.getDatabaseFilename()):
+                print('fatal: no bug database, run `bugs.py update\' first',
+                      file=sys.stderr)
+                return 1
+            bugDAO = SqliteBugDAO(self.getDatabaseFilename())
+            try:
+                bugs = bugDAO.query(prefix, tag, text)
+            finally:
+                bugDAO.close()
+        # Same order as the unfiltered list, which is sorted by task id
+        lines = [fn + ': ' + BugScanner.formatBug(bug) for fn, *bug in bugs]
+        for line in sorted(lines, key=lambda line:
+                           hashlib.sha1(line.encode('utf-8')).hexdigest()):
+            print(line)
+        return 0
+
+    def printBugsFile(self):
+        """
+        INTERNAL. Print the text of every bug in the bugs file, sorted by id as
+        t.TaskDict.print_list() does, without building a TaskDict. The file is
+        written in that order, so it is only sorted if it was edited by hand.
+        """
+        try:
+            with open(os.path.join(self.gitDir, 'bugs')) as bugsFile:
+                lines = bugsFile.read().splitlines()
+        except FileNotFoundError:
+            return 0
+        tasks = list()
+        for line in lines:
+            # Parse the lines like t does
+            line = line.strip()
+            if line.startswith('#'):
+                continue
+            if '|' not in line:
+                import hashlib
+                tasks.append((hashlib.sha1(line.encode('utf-8')).hexdigest(),
+                              line))
+                continue
+            text, _, metadata = line.rpartition('|')
+            for piece in metadata.split(','):
+                label, _, value = piece.partition(':')
+                if label.strip() == 'id':
+                    tasks.append((value.strip(), text.strip()))
+        if any(tasks[index][0] >= tasks[index + 1][0]
+               for index in range(len(tasks) - 1)):
+            tasks = sorted(dict(tasks).items())
+        if tasks:
+            sys.stdout.write('\n'.join(text for _, text in tasks) + '\n')
+        return 0
+
+    def printShards(self, path=None):
+        """
+        INTERNAL. Print the bugs in the files under `path', or every bug, from
+        the shards of the bugs file, sorted by id. Only the shards of the
+        directories above or under `path' are read.
+        """
+        from BugShardIndex import BugShardIndex
+        index = BugShardIndex.load(self.getShardDirectory())
+        if index is None:
+            print('fatal: cannot read the manifest of the bugs file, run '
+                  '`bugs.py update\' again', file=sys.stderr)
+            return 1
+        prefix = self.getPathPrefix(path) if path else None
+        for _, text in index.getTasks(prefix):
+            print(text)
+        return 0
+
+    def getPathPrefix(self, path):
+        """
+        INTERNAL. Return the prefix of the paths in the bugs file of the files
+        under `path', a path relative to the working directory of the caller.
+        """
+        path = os.path.join(self.cwd, path)
+        relative = os.path.relpath(os.path.abspath(path),
+                                   os.path.abspath(self.gitDir))
+        if relative == os.curdir:
+            return './'
+        prefix = './' + relative.replace(os.sep, '/')
+        return prefix + '/' if os.path.isdir(path) else prefix
 
 ###############################################################################
 # MAIN
 ###
 
+def printWarning(message):
+    """Print a warning to stderr, in colour if it is a terminal."""
+    if sys.stderr.isatty():
+        from colorama.colorama import Fore, Style
+        message = Fore.YELLOW + 'Warning' + Style.RESET_ALL + ': ' + message
+    else:
+        message = 'Warning: ' + message
+    print(message, file=sys.stderr)
+
+def scanBatch(fileNames, scanner):
+    """
+    Scan the files `fileNames' with the BugScanner `scanner', in a worker of
+    Bugs.iterateScan. Return the list of the results of timeGetBugs.
+    """
+    return [Bugs.timeGetBugs(fileName, scanner) for fileName in fileNames]
+
+def updateSubmodule(path, scanner, untracked, submodules):
+    """
+    Update the submodule at `path', in a worker process of Bugs.scan. With
+    `submodules' set to 'merged', save its scan cache and return its file list
+    and the results of the scan, for the bugs file of the superproject.
+    Otherwise update its own bugs file, and return None.
+    """
+    bugs = Bugs(path)
+    if submodules != 'merged':
+        bugs.update(1, scanner, untracked, submodules=submodules)
+        return None
+    fileList, results, cache = bugs.scan(1, scanner, untracked,
+                                         submodules=submodules)
+    cache.prune(fileList)
+    cache.write()
+    return fileList, results
+
+def serveRequest(repositories, argv, cwd):
+    """
+    Run the command `argv' in the directory `cwd' on behalf of a client of the
+    daemon. `repositories' maps the root of each repository served so far to
+    its resident Bugs object.
+    """
+    root = Bugs.findRepositoryRoot(cwd)
+    bugs = repositories.get(root)
+    if bugs is None:
+        bugs = Bugs(cwd)
+        bugs.resident = True
+        if root is not None:
+            repositories[root] = bugs
+    bugs.cwd = os.path.abspath(cwd)
+    return BugTracker(argv, bugs).run()
+
 def main():
     """Run bugs"""
-    colorama.init() # Initialize colorama
+    # Printing the bugs is what runs on every prompt, so it takes the shortest
+    # path: no argument parsing, no daemon, no colour, and no TaskDict.
+    if sys.argv[1:] in ([], ['print']):
+        from FileTreeExceptions import NotAValidFileTreeRootException
+        try:
+            return Bugs('.').printBugs()
+        except NotAValidFileTreeRootException as error:
+            print('fatal: ' + str(error), file=sys.stderr)
+            return 1
+
+    if sys.stdout.isatty() or sys.stderr.isatty():
+        from colorama import colorama
+        colorama.init() # Initialize colorama
 
-    # TODO: bugs.py uses parent repo's .bignore when repo is submodule
     # TODO: Determine the config
     #       based on the format of the strings in the previous file (if exists)
     #       then overwrite with any flags.
 
+    # Let the daemon answer, if one is running
+    # Profiles and statistics are of this process, so it does the work itself.
+    # The daemon replies once it is done, so streamed output is not sent to it.
+    # Nor is the temporary index of a commit hook, which it would not read.
+    if sys.argv[1:2] in (['print'], ['update']) \
+       and not os.environ.get('BUGS_NO_DAEMON') \
+       and not os.environ.get('BUGS_PROFILE') \
+       and not os.environ.get('BUGS_STATS') \
+       and not os.environ.get('GIT_INDEX_FILE') \
+       and '--profile' not in sys.argv and '--stdout' not in sys.argv \
+       and '--staged' not in sys.argv:
+        from BugDaemon import BugDaemon
+        status = BugDaemon.forward({'argv': sys.argv[1:],
+                                    'cwd': os.getcwd()})
+        if status is not None:
+            return status
+
     ### Find the Git repository
     bugTracker = BugTracker(sys.argv[1:], Bugs('.'))
     return bugTracker.run()
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
 
 ##############################################################################
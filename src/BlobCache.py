@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+###############################################################################
+# NAME:             BlobCache.py
+#
+# AUTHOR:           Ethan D. Twardy <edtwardy@mtu.edu>
+#
+# DESCRIPTION:      Content-addressed cache of the bugs found in git blobs,
+#                   shared by every repository of the user. Files with the same
+#                   contents are only scanned once across branches, worktrees
+#                   and clones.
+#
+# CREATED:          10/18/2026
+#
+# LAST EDITED:      10/18/2026
+###
+
+import json
+import os
+import sqlite3
+
+###############################################################################
+# Class BlobCache
+###
+
+class BlobCache:
+    """
+    Cache of the bugs found in each git blob, keyed on the blob's SHA and on
+    the comment syntax it was scanned with, which depends on the name of the
+    file.
+    """
+
+    # Bump this when the schema changes. Older caches are dropped.
+    version = 1
+
+    def __init__(self, filename, signature=''):
+        """
+        Initialize a BlobCache stored in the SQLite database filename. The
+        signature identifies the settings the scan results depend on, results
+        recorded with other settings are not seen.
+        """
+        self.filename = filename
+        self.signature = signature
+        self.connection = None
+        try:
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            self.connection = sqlite3.connect(filename, timeout=10)
+            version, = self.connection.execute(
+                'PRAGMA user_version').fetchone()
+            if version != self.version:
+                with self.connection:
+                    self.connection.execute('DROP TABLE IF EXISTS blobs')
+                    self.connection.execute(
+                        'PRAGMA user_version = {}'.format(self.version))
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS blobs (signature TEXT, '
+                'syntax TEXT, sha TEXT, bugs TEXT, '
+                'PRIMARY KEY (signature, syntax, sha))')
+        except (OSError, sqlite3.Error):
+            # The cache is only an optimization, work without it.
+            self.connection = None
+
+    @staticmethod
+    def getDefaultFilename():
+        """Return the path of the cache shared by the user's repositories."""
+        cacheHome = os.environ.get('XDG_CACHE_HOME') \
+            or os.environ.get('LOCALAPPDATA') \
+            or os.path.join(os.path.expanduser('~'), '.cache')
+        return os.path.join(cacheHome, 'bugs', 'blobs.sqlite')
+
+    def lookup(self, sha, syntax):
+        """
+        Return the list of bugs cached for the blob sha scanned with the
+        comment syntax named syntax, or None.
+        """
+        if self.connection is None:
+            return None
+        try:
+            row = self.connection.execute(
+                'SELECT bugs FROM blobs WHERE signature = ? AND syntax = ? '
+                'AND sha = ?', (self.signature, syntax, sha)).fetchone()
+        except sqlite3.Error:
+            return None
+        return json.loads(row[0]) if row is not None else None
+
+    def store(self, sha, syntax, bugs):
+        """
+        Record the bugs found in the blob sha, scanned with the comment syntax
+        named syntax.
+        """
+        if self.connection is None:
+            return
+        try:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?)',
+                (self.signature, syntax, sha, json.dumps(list(bugs))))
+        except sqlite3.Error:
+            pass
+
+    def commit(self):
+        """Commit the new entries to the database."""
+        if self.connection is None:
+            return
+        try:
+            self.connection.commit()
+        except sqlite3.Error:
+            pass
+
+    def close(self):
+        """Commit the new entries to the database and close it."""
+        if self.connection is None:
+            return
+        self.commit()
+        try:
+            self.connection.close()
+        except sqlite3.Error:
+            pass
+        self.connection = None
+
+###############################################################################
@@ -9,9 +9,11 @@
 #
 # CREATED:          07/14/2019
 #
-# LAST EDITED:      07/15/2019
+# LAST EDITED:      10/18/2026
 ###
 
+from BugFileWriter import BugFileWriter
+
 ###############################################################################
 # Class BugDAO
 ###
@@ -31,7 +33,7 @@ class BugDAO:
 
     def parseConfig(self, string):
         """Parse string to obtain the config for this DAO."""
-        for pair in string[2].split(' '):
+        for pair in string[2:].split():
             key, value = pair.split('=')
             self.config[key] = value
 
@@ -41,10 +43,7 @@ class BugDAO:
 
     def serializeConfig(self):
         """Create a string using the config of this DAO."""
-        string = ''
-        for key in self.config:
-            string += key + '=' + self.config[key]
-        return string
+        return ' '.join(key + '=' + self.config[key] for key in self.config)
 
     def readBugFile(self):
         """
@@ -57,7 +56,7 @@ class BugDAO:
                 raise ValueError('The provided filename does not correspond '
                                  'to a valid bugs file')
             self.parseConfig(lines[0])
-            return lines[1:]
+            return [line.rstrip('\n') for line in lines[1:]]
 
     def printBugs(self, outputFile):
         """Print the list of bugs to outputFile."""
@@ -65,9 +64,12 @@ class BugDAO:
             print(line, file=outputFile)
 
     def write(self):
-        """Write the list of bugs to this BugDAO's file."""
-        with open(self.filename, 'w') as outputFile:
-            outputFile.write('# ' + self.serializeConfig())
-            self.printBugs(outputFile)
+        """
+        Write the list of bugs to this BugDAO's file. The file is replaced
+        atomically, and only if its contents change.
+        """
+        BugFileWriter(self.filename).write(
+            ['# ' + self.serializeConfig() + '\n']
+            + [line + '\n' for line in self.bugs])
 
 ###############################################################################
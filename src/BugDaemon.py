@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+###############################################################################
+# NAME:             BugDaemon.py
+#
+# AUTHOR:           Ethan D. Twardy <edtwardy@mtu.edu>
+#
+# DESCRIPTION:      Opt-in background server answering the commands of bugs.py
+#                   over a Unix domain socket, so the state of each repository
+#                   (ignore rules, index, scan cache) stays warm between calls.
+#
+# CREATED:          10/18/2026
+#
+# LAST EDITED:      10/18/2026
+###
+
+from contextlib import redirect_stdout, redirect_stderr
+import io
+import json
+import os
+import socket
+import tempfile
+import traceback
+
+###############################################################################
+# Class BugDaemon
+###
+
+class BugDaemon:
+    """
+    Serves requests of the form {"argv": [...], "cwd": "..."} sent as one line
+    of JSON, answering with the exit status and the output of the command.
+    """
+
+    def __init__(self, handler, path=None):
+        """
+        Initialize a BugDaemon listening on the socket path, or the default
+        socket if it is None. handler(argv, cwd) runs a command and returns its
+        exit status; whatever it prints is sent back to the client.
+        """
+        self.handler = handler
+        self.path = path or self.getSocketPath()
+        self.running = False
+
+    @staticmethod
+    def getSocketPath():
+        """Return the path of the socket of the daemon of the current user."""
+        if os.environ.get('BUGS_SOCKET'):
+            return os.environ['BUGS_SOCKET']
+        if os.environ.get('XDG_RUNTIME_DIR'):
+            return os.path.join(os.environ['XDG_RUNTIME_DIR'], 'bugs.sock')
+        return os.path.join(tempfile.gettempdir(),
+                            'bugs-{}.sock'.format(os.getuid()))
+
+    @staticmethod
+    def forward(request, path=None):
+        """
+        Send request to the running daemon, and copy its output to stdout and
+        stderr. Return the exit status of the command, or None if no daemon is
+        listening, in which case the caller should run the command itself.
+        """
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            connection.connect(path or BugDaemon.getSocketPath())
+        except OSError:
+            connection.close()
+            return None
+        with connection:
+            connection.sendall(json.dumps(request).encode() + b'\n')
+            connection.shutdown(socket.SHUT_WR)
+            with connection.makefile('rb') as replyFile:
+                reply = replyFile.read()
+        try:
+            reply = json.loads(reply.decode())
+        except ValueError:
+            return None # The daemon went away while serving us
+        os.write(1, reply.get('stdout', '').encode())
+        os.write(2, reply.get('stderr', '').encode())
+        return reply.get('status', 1)
+
+    def serveForever(self):
+        """Answer requests until a client asks the daemon to stop."""
+        if self.forward({'ping': True}, self.path) is not None:
+            raise OSError('A daemon is already listening on ' + self.path)
+        try:
+            os.unlink(self.path) # Left behind by a daemon that crashed
+        except FileNotFoundError:
+            pass
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        with listener:
+            # Only the current user may connect
+            oldUmask = os.umask(0o177)
+            try:
+                listener.bind(self.path)
+            finally:
+                os.umask(oldUmask)
+            listener.listen()
+            self.running = True
+            try:
+                while self.running:
+                    connection, _ = listener.accept()
+                    with connection:
+                        self.handle(connection)
+            finally:
+                os.unlink(self.path)
+
+    def handle(self, connection):
+        """INTERNAL. Serve the request sent over connection."""
+        with connection.makefile('rb') as requestFile:
+            try:
+                request = json.loads(requestFile.readline().decode())
+            except ValueError:
+                return
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        status = 0
+        if request.get('stop'):
+            self.running = False
+        elif not request.get('ping'):
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                try:
+                    status = self.handler(request['argv'], request['cwd'])
+                except SystemExit as error:
+                    status = error.code if isinstance(error.code, int) else 1
+                except Exception: #pylint: disable=broad-except
+                    traceback.print_exc()
+                    status = 1
+        reply = {'status': status, 'stdout': stdout.getvalue(),
+                 'stderr': stderr.getvalue()}
+        try:
+            connection.sendall(json.dumps(reply).encode())
+        except OSError:
+            pass # The client went away
+
+###############################################################################
@@ -8,10 +8,14 @@
 #
 # CREATED:          07/18/2019
 #
-# LAST EDITED:      07/22/2019
+# LAST EDITED:      10/18/2026
 ###
 
+import os
+
+import FilesystemDriver
 from IFileTree import IFileTree
+from IgnoreMatcher import IgnoreMatcher
 from RepositoryFactory import RepositoryFactory
 from RepositoryExceptions import NotAValidRepositoryException
 from FileTreeExceptions import NotAValidFileTreeRootException
@@ -26,50 +30,73 @@ class BugFileTree(IFileTree):
         super()
         try:
             self.repository = RepositoryFactory.getRepository(path)
-            self.rootNode = BugFileTreeNode(path)
+            self.rootNode = BugFileTreeNode(path, True)
+            self.ignoreMatcher = None
         except NotAValidRepositoryException:
-            raise NotAValidFileTreeRootException()
+            raise NotAValidFileTreeRootException(
+                'not a git repository: ' + os.path.join(
+                    os.path.abspath(path), '.git'))
+
+    def getRootNode(self):
+        """Return the FileTreeNode at the root of this tree."""
+        return self.rootNode
 
-    def searchTopDown(function, *args):
+    def getIgnoreMatcher(self):
+        """Get the IgnoreMatcher deciding which files of the tree to skip."""
+        if self.ignoreMatcher is None:
+            self.ignoreMatcher = IgnoreMatcher(
+                self.rootNode.getPath(), excludeFile=os.path.join(
+                    self.repository.commonDir, 'info', 'exclude'))
+        return self.ignoreMatcher
+
+    def searchTopDown(self, function, *args):
         """
         Search the file tree, top down, and invoke function on each node in the
         tree. The function must take an IFileTreeNode object as it's first
         argument. Subsequent arguments may be passed using the variable args.
         It's important that function does not change the paths of files in the
-        directory, as that results in undefined behavior.
+        directory, as that results in undefined behavior. Ignored files are
+        skipped, and ignored directories are never entered, nor are other
+        repositories nested in this one, like submodules.
         """
-        pass
-
-    @staticmethod
-    def readIgnoreFile(ignoreFilename):
-        """INTERNAL. Read ignoreFilename file for the list of regexes."""
-        try:
-            with open(ignoreFilename, 'r') as ignoreFile:
-                return list(filter(('').__ne__,
-                                   [ln.rstrip('\n')
-                                    for ln in ignoreFile.readlines()]))
-        except FileNotFoundError:
-            pass
-
-    def getIgnoreList():
-        """Get the list of files to ignore in the file tree."""
-        # Automatically ignore .git/ and bugs
-        rejectFilenames = [self.path + '.git/', '~']
-        rejectRegexes = []
-        # Read .bignore file, if it exists
-        rejectRegexes.extend(self.readIgnoreFile(self.path + '/.bignore')
-                             or [])
-        # Read .gitignore file, if it exists
-        rejectRegexes.extend(self.readIgnoreFile(self.path + '/.gitignore')
-                             or [])
+        for node in self.walk():
+            function(node, *args)
 
-        # Expand shell-style globs in rejectRegexes
-        for regex in rejectRegexes:
-            if '*' in regex:
-                rejectFilenames.extend(glob(self.path + '/**/' + regex,
-                                            recursive=True))
-            else:
-                rejectFilenames.append(regex)
+    def walk(self):
+        """
+        Yield the nodes of the file tree, top down, as searchTopDown visits
+        them. Directories are only read as the nodes are consumed, so the
+        first nodes are available before the whole tree has been walked.
+        """
+        ignoreMatcher = self.getIgnoreMatcher()
+        yield self.rootNode
+        # Each directory is read exactly once, and the type information of
+        # its entries is reused instead of calling stat on each of them.
+        stack = [('', self.rootNode.getPath())]
+        while stack:
+            relative, directory = stack.pop()
+            try:
+                with FilesystemDriver.scandir(directory) as iterator:
+                    entries = sorted(iterator, key=lambda entry: entry.name)
+            except OSError:
+                continue # Unreadable, or removed while we were walking
+            subdirectories = list()
+            for entry in entries:
+                entryPath = relative + '/' + entry.name if relative \
+                    else entry.name
+                try:
+                    isDir = entry.is_dir()
+                except OSError:
+                    isDir = False
+                if ignoreMatcher.isIgnored(entryPath, isDir):
+                    continue
+                yield BugFileTreeNode(entry.path, isDir)
+                # Don't follow symbolic links, they could form a cycle
+                if isDir and not entry.is_symlink() \
+                   and not FilesystemDriver.lexists(
+                       os.path.join(entry.path, '.git')):
+                    subdirectories.append((entryPath, entry.path))
+            stack.extend(reversed(subdirectories))
 
 
 ###############################################################################
@@ -8,18 +8,22 @@
 #
 # CREATED:          07/18/2019
 #
-# LAST EDITED:      07/20/2019
+# LAST EDITED:      10/18/2026
 ###
 
-import os
-
+import FilesystemDriver
+from FileTreeExceptions import NoContainingFileTreeException, \
+    NotAValidFileTreeRootException
 from IFileTreeNode import IFileTreeNode
+from RepositoryLocator import RepositoryLocator
 
 class BugFileTreeNode(IFileTreeNode):
     """Class representing a node in a BugFileTree."""
-    def __init__(self, path):
+    def __init__(self, path, isDir=None):
         super()
-        self.path = os.path.abspath(path)
+        self.path = FilesystemDriver.abspath(path)
+        # Known by whoever listed the parent directory, so no stat is needed
+        self.isDir = isDir
 
     def getPath(self):
         """Return the filesystem path referring to this node."""
@@ -27,24 +31,41 @@ class BugFileTreeNode(IFileTreeNode):
 
     def getName(self):
         """Return the base name of the filesystem entry this node refers to."""
-        return os.path.basename(self.path)
+        return FilesystemDriver.basename(self.path)
+
+    def isDirectory(self):
+        """Return True if this node refers to a directory."""
+        if self.isDir is None:
+            self.isDir = FilesystemDriver.isdir(self.path)
+        return self.isDir
 
     def getContainingFileTree(self):
-        """Return the FileTree object containing this node, if it exists."""
+        """
+        Return the FileTree object containing this node, if it exists. The
+        root of its repository is found in a single walk up the tree, and only
+        the BugFileTree of that root is built.
+        """
+        # BugFileTree imports this module
+        #pylint: disable=import-outside-toplevel
+        from BugFileTree import BugFileTree
+        directory = self.path if self.isDirectory() \
+            else FilesystemDriver.dirname(self.path)
+        root = RepositoryLocator.findRoot(directory)
+        if root is None:
+            raise NoContainingFileTreeException()
         try:
-            return BugFileTree(self.path)
+            return BugFileTree(root)
         except NotAValidFileTreeRootException:
-            if self.path == self._getRootDirectory():
-                raise NoContainingFileTreeException
-            return self.getParent().getContainingFileTree()
+            raise NoContainingFileTreeException()
 
     def getChildren(self):
         """Return a list of the children of this node."""
         children = list()
-        if not os.path.isdir(self.path):
+        if not self.isDirectory():
             return children
-        for fname in os.listdir(self.path):
-            children.append(BugFileTreeNode(self.path + os.path.sep + fname))
+        for fname in FilesystemDriver.listdir(self.path):
+            children.append(BugFileTreeNode(
+                self.path + FilesystemDriver.sep + fname))
         return children
 
     def getParent(self):
@@ -52,11 +73,11 @@ class BugFileTreeNode(IFileTreeNode):
         root = self._getRootDirectory()
         if self.path == root:
             return None
-        return BugFileTreeNode(
-            os.path.sep.join(self.path.split(os.path.sep)[:-1]))
+        return BugFileTreeNode(FilesystemDriver.join(
+            FilesystemDriver.split(self.path)[:-1]))
 
     def _getRootDirectory(self):
         """INTERNAL: Get the path of the root directory"""
-        return os.path.abspath(self.path).split(os.path.sep)[0]
+        return FilesystemDriver.split(FilesystemDriver.abspath(self.path))[0]
 
 ###############################################################################
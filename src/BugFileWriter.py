@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+###############################################################################
+# NAME:             BugFileWriter.py
+#
+# AUTHOR:           Ethan D. Twardy <edtwardy@mtu.edu>
+#
+# DESCRIPTION:      Writes the bugs file atomically: the lines are streamed to
+#                   a temporary file, which is synced and renamed over the
+#                   bugs file, unless its contents have not changed. Readers
+#                   never see a partial file, and watchers are not woken up
+#                   by an update that found nothing new.
+#
+# CREATED:          10/18/2026
+#
+# LAST EDITED:      10/18/2026
+###
+
+import errno
+import hashlib
+import os
+import shutil
+import tempfile
+
+###############################################################################
+# Class BugFileWriter
+###
+
+class BugFileWriter:
+    """
+    Replaces a file with new contents, atomically and only when they differ.
+    The bugs file is written in the format of t: one `text | id:<id>' line
+    per bug, where the id is the SHA-1 of the text, sorted by id.
+    """
+
+    blockSize = 65536
+
+    def __init__(self, filename, temporaryDir=None):
+        """
+        Initialize a BugFileWriter replacing the file filename. The temporary
+        file is created in temporaryDir, or next to filename if it is None. It
+        is copied next to filename first if temporaryDir is on another
+        filesystem.
+        """
+        self.filename = filename
+        self.temporaryDir = temporaryDir or os.path.dirname(
+            os.path.abspath(filename))
+
+    @staticmethod
+    def getTaskDigest(text):
+        """
+        Return the SHA-1 digest of the task text, as bytes. Its hexadecimal
+        form is the id of the task, and both sort the same way.
+        """
+        return hashlib.sha1(text.encode('utf-8', 'surrogateescape')).digest()
+
+    @staticmethod
+    def formatTask(text, digest):
+        """Return the line in the bugs file of the task text with digest."""
+        return '{} | id:{}\n'.format(text, digest.hex())
+
+    @staticmethod
+    def getTextDigest(chunks):
+        """Return the hexadecimal SHA-1 digest of the strings of chunks."""
+        digest = hashlib.sha1()
+        for chunk in chunks:
+            digest.update(chunk.encode('utf-8', 'surrogateescape'))
+        return digest.hexdigest()
+
+    def writeTasks(self, texts, deleteIfEmpty=True):
+        """
+        Replace the file with the tasks texts, sorted by id. Tasks with the
+        same text are written once. The file is removed if there are none and
+        deleteIfEmpty is True. Return True if the file changed. Only the text
+        and the digest of each task are held in memory, its line is formatted
+        as it is written.
+        """
+        tasks = {self.getTaskDigest(text): text for text in texts}
+        if not tasks and deleteIfEmpty:
+            try:
+                os.unlink(self.filename)
+            except FileNotFoundError:
+                return False
+            return True
+        return self.write(self.formatTask(tasks[digest], digest)
+                          for digest in sorted(tasks))
+
+    def write(self, chunks):
+        """
+        Replace the file with the strings of the iterable chunks, written in
+        order. Return True if the file changed, or False if it already held
+        the same contents, in which case it is not touched at all.
+        """
+        digest = hashlib.sha1()
+        descriptor, temporary = tempfile.mkstemp(
+            prefix='.' + os.path.basename(self.filename) + '-',
+            suffix='.tmp', dir=self.temporaryDir)
+        try:
+            with open(descriptor, 'w', encoding='utf-8',
+                      errors='surrogateescape', newline='') as outputFile:
+                for chunk in chunks:
+                    outputFile.write(chunk)
+                    digest.update(chunk.encode('utf-8', 'surrogateescape'))
+                if self.getDigest(self.filename) == digest.digest():
+                    return False
+                outputFile.flush()
+                os.fsync(outputFile.fileno())
+            # Keep the permissions of the file being replaced
+            try:
+                os.chmod(temporary, os.stat(self.filename).st_mode & 0o7777)
+            except FileNotFoundError:
+                os.chmod(temporary, 0o666 & ~self.getUmask())
+            try:
+                os.replace(temporary, self.filename)
+            except OSError as error:
+                if error.errno != errno.EXDEV:
+                    raise
+                # The git directory named by a .git file or GIT_DIR may be on
+                # another filesystem than the working tree.
+                temporary, original = self.copyNextToFile(temporary), \
+                    temporary
+                os.unlink(original)
+                os.replace(temporary, self.filename)
+            temporary = None
+            self.syncDirectory(os.path.dirname(os.path.abspath(self.filename)))
+            return True
+        finally:
+            if temporary is not None:
+                os.unlink(temporary)
+
+    def copyNextToFile(self, temporary):
+        """
+        INTERNAL. Copy the temporary file to a new temporary file in the
+        directory of the file, synced, and return the path of the copy.
+        """
+        descriptor, copy = tempfile.mkstemp(
+            prefix='.' + os.path.basename(self.filename) + '-',
+            suffix='.tmp', dir=os.path.dirname(os.path.abspath(self.filename)))
+        try:
+            with open(descriptor, 'wb') as outputFile:
+                with open(temporary, 'rb') as inputFile:
+                    shutil.copyfileobj(inputFile, outputFile, self.blockSize)
+                outputFile.flush()
+                os.fsync(outputFile.fileno())
+            shutil.copymode(temporary, copy)
+            copy, result = None, copy
+            return result
+        finally:
+            if copy is not None:
+                os.unlink(copy)
+
+    def getDigest(self, filename):
+        """
+        INTERNAL. Return the SHA-1 digest of the contents of filename, or None
+        if it cannot be read.
+        """
+        digest = hashlib.sha1()
+        try:
+            with open(filename, 'rb') as inputFile:
+                for block in iter(lambda: inputFile.read(self.blockSize),
+                                  b''):
+                    digest.update(block)
+        except OSError:
+            return None
+        return digest.digest()
+
+    @staticmethod
+    def getUmask():
+        """INTERNAL. Return the umask of the process."""
+        umask = os.umask(0)
+        os.umask(umask)
+        return umask
+
+    @staticmethod
+    def syncDirectory(directory):
+        """INTERNAL. Make a rename in directory durable, where possible."""
+        try:
+            descriptor = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return # Directories cannot be opened on every platform
+        try:
+            os.fsync(descriptor)
+        except OSError:
+            pass
+        finally:
+            os.close(descriptor)
+
+###############################################################################
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+###############################################################################
+# NAME:             BugHistory.py
+#
+# AUTHOR:           Ethan D. Twardy <edtwardy@mtu.edu>
+#
+# DESCRIPTION:      Records when each bug appeared in and disappeared from the
+#                   history of a repository, in a SQLite database. Commits are
+#                   processed once: later runs only walk the new ones.
+#
+# CREATED:          10/18/2026
+#
+# LAST EDITED:      10/18/2026
+###
+
+import sqlite3
+
+###############################################################################
+# Class BugHistory
+###
+
+class BugHistory:
+    """
+    The history of the bugs along the first parent chain of a branch. Each
+    commit is compared to its first parent, and only the files whose blob
+    changed are looked at. A bug is identified by its path, tag, priority
+    and text, so a bug that is moved or edited disappears and a new one
+    appears.
+    """
+
+    # Bump this when the schema changes. Older databases are rebuilt.
+    version = 1
+    schema = [
+        'CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, '
+        'value TEXT)',
+        'CREATE TABLE IF NOT EXISTS bugs (id INTEGER PRIMARY KEY, '
+        'path TEXT NOT NULL, tag TEXT NOT NULL, priority TEXT, '
+        'text TEXT NOT NULL, introduced TEXT NOT NULL, '
+        'introducedTime INTEGER NOT NULL, removed TEXT, removedTime INTEGER)',
+        'CREATE INDEX IF NOT EXISTS bugsByPath ON bugs (path, removed)',
+    ]
+    # Progress is committed this often, so an interrupted run is not lost
+    commitInterval = 1000
+
+    modeTypeMask = 0o170000
+    modeTree = 0o040000
+    modeRegularFile = 0o100000
+
+    def __init__(self, filename):
+        """Initialize a BugHistory stored in the SQLite database filename."""
+        self.filename = filename
+        self.connection = sqlite3.connect(filename, timeout=10)
+        version, = self.connection.execute('PRAGMA user_version').fetchone()
+        if version != self.version:
+            self.reset()
+        for statement in self.schema:
+            self.connection.execute(statement)
+
+    def reset(self):
+        """INTERNAL. Forget everything, the history is walked again."""
+        with self.connection:
+            for table in ('state', 'bugs'):
+                self.connection.execute('DROP TABLE IF EXISTS ' + table)
+            self.connection.execute(
+                'PRAGMA user_version = {}'.format(self.version))
+        for statement in self.schema:
+            self.connection.execute(statement)
+
+    def getState(self, key):
+        """INTERNAL. Return the value stored for key, or None."""
+        row = self.connection.execute('SELECT value FROM state WHERE key = ?',
+                                      (key,)).fetchone()
+        return row[0] if row is not None else None
+
+    def setState(self, key, value):
+        """INTERNAL. Store value for key."""
+        self.connection.execute('INSERT OR REPLACE INTO state VALUES (?, ?)',
+                                (key, value))
+
+    def update(self, store, head, getBugs, signature):
+        """
+        Process the commits of the first parent chain of the commit head that
+        have not been seen yet, reading them from the GitObjectStore store.
+        getBugs(path, sha) returns the bugs in the blob sha at path, as
+        [tag, priority, text] lists, or None if the file is not scanned.
+        signature identifies the settings getBugs depends on, the history is
+        walked again from the start if they changed. Return the number of
+        commits processed.
+        """
+        if self.getState('signature') != signature:
+            self.reset()
+            self.setState('signature', signature)
+        last = self.getState('commit')
+        mainline = list()
+        commit = head
+        while commit is not None and commit != last:
+            mainline.append(commit)
+            parents = store.getParents(commit)
+            commit = parents[0] if parents else None
+        if last is not None and commit is None:
+            # The last commit seen is gone, the branch has been rewritten
+            self.reset()
+            self.setState('signature', signature)
+            return self.update(store, head, getBugs, signature)
+
+        previousTree = store.getTree(last) if last is not None else None
+        for count, commit in enumerate(reversed(mainline), 1):
+            tree = store.getTree(commit)
+            time = self.getCommitTime(store, commit)
+            for path, oldSha, newSha in self.diffTrees(store, previousTree,
+                                                       tree):
+                oldBugs = self.getBugSet(getBugs, path, oldSha)
+                newBugs = self.getBugSet(getBugs, path, newSha)
+                for tag, priority, text in oldBugs - newBugs:
+                    self.connection.execute(
+                        'UPDATE bugs SET removed = ?, removedTime = ? '
+                        'WHERE path = ? AND tag = ? AND priority IS ? '
+                        'AND text = ? AND removed IS NULL',
+                        (commit, time, path, tag, priority, text))
+                self.connection.executemany(
+                    'INSERT INTO bugs (path, tag, priority, text, introduced, '
+                    'introducedTime) VALUES (?, ?, ?, ?, ?, ?)',
+                    [(path, tag, priority, text, commit, time)
+                     for tag, priority, text in newBugs - oldBugs])
+            previousTree = tree
+            self.setState('commit', commit)
+            if count % self.commitInterval == 0:
+                self.connection.commit()
+        self.connection.commit()
+        return len(mainline)
+
+    @staticmethod
+    def getBugSet(getBugs, path, sha):
+        """INTERNAL. Return the set of the bugs of a blob, as tuples."""
+        if sha is None:
+            return set()
+        return {tuple(bug) for bug in getBugs(path, sha) or []}
+
+    @staticmethod
+    def getCommitTime(store, commit):
+        """INTERNAL. Return the committer timestamp of commit."""
+        headers, _ = store.readCommit(commit)
+        for name, value in headers:
+            if name == 'committer':
+                try:
+                    return int(value.rsplit(' ', 2)[1])
+                except (IndexError, ValueError):
+                    break
+        return 0
+
+    def diffTrees(self, store, oldTree, newTree, prefix=''):
+        """
+        INTERNAL. Yield a (path, old SHA, new SHA) tuple for every regular
+        file that differs between the trees oldTree and newTree, either of
+        which may be None. The SHA is None on the side the file is missing
+        from. Subtrees with the same SHA are not read.
+        """
+        if oldTree == newTree:
+            return
+        oldEntries = self.readEntries(store, oldTree)
+        newEntries = self.readEntries(store, newTree)
+        for name in sorted(oldEntries.keys() | newEntries.keys()):
+            old = oldEntries.get(name, (None, None))
+            new = newEntries.get(name, (None, None))
+            if old == new:
+                continue
+            path = prefix + name
+            oldSubtree = old[1] if old[0] == self.modeTree else None
+            newSubtree = new[1] if new[0] == self.modeTree else None
+            if oldSubtree is not None or newSubtree is not None:
+                yield from self.diffTrees(store, oldSubtree, newSubtree,
+                                          path + '/')
+            oldBlob = old[1] if old[0] == self.modeRegularFile else None
+            newBlob = new[1] if new[0] == self.modeRegularFile else None
+            if oldBlob != newBlob:
+                yield path, oldBlob, newBlob
+
+    def readEntries(self, store, tree):
+        """
+        INTERNAL. Return a dict mapping the names in the tree to their type
+        (trees and regular files, other entries are left out) and SHA.
+        """
+        if tree is None:
+            return dict()
+        entries = dict()
+        for mode, name, sha in store.readTree(tree):
+            mode &= self.modeTypeMask
+            if mode in (self.modeTree, self.modeRegularFile):
+                entries[name] = (mode, sha)
+        return entries
+
+    def query(self, includeRemoved=False):
+        """
+        Return an iterator of the (path, tag, priority, text, introduced,
+        introducedTime, removed, removedTime) tuples of the bugs, oldest
+        first. Only the bugs that are still present are returned, unless
+        includeRemoved is True. The rows are read from the database as they
+        are iterated over, so they need not all fit in memory at once.
+        """
+        statement = 'SELECT path, tag, priority, text, introduced, ' \
+            'introducedTime, removed, removedTime FROM bugs'
+        if not includeRemoved:
+            statement += ' WHERE removed IS NULL'
+        statement += ' ORDER BY introducedTime, id'
+        return self.connection.execute(statement)
+
+    def close(self):
+        """Close the database."""
+        self.connection.close()
+
+###############################################################################
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+###############################################################################
+# NAME:             BugRecord.py
+#
+# AUTHOR:           Ethan D. Twardy <edtwardy@mtu.edu>
+#
+# DESCRIPTION:      Compact record of the bugs of one file, for holding
+#                   hundreds of thousands of them in memory, like the
+#                   resident scan cache of the daemon. The bugs are packed in
+#                   a single string, and only unpacked when they are read.
+#
+# CREATED:          10/18/2026
+#
+# LAST EDITED:      10/18/2026
+###
+
+import sys
+
+###############################################################################
+# Class BugRecord
+###
+
+class BugRecord:
+    """
+    The bugs of one file, read as a sequence of (tag, priority, text) tuples,
+    like the [tag, priority, text] lists of BugScanner. A bug never spans more
+    than one line, so the bugs are separated by newlines and their fields by
+    carriage returns. A bug without a priority only has two fields. A bug
+    costs the characters of its tag and text, instead of a list and a string
+    object of its own.
+    """
+    __slots__ = ('packed',)
+
+    bugSeparator = '\n'
+    fieldSeparator = '\r'
+
+    def __init__(self, bugs=()):
+        """Initialize a BugRecord holding the bugs of the iterable bugs."""
+        self.packed = self.bugSeparator.join(self.packBug(*bug)
+                                             for bug in bugs)
+
+    @classmethod
+    def fromBugs(cls, bugs):
+        """
+        Return a BugRecord holding the bugs of the iterable bugs. BugRecords
+        and None, which stands for a file that could not be decoded, are
+        returned as they are.
+        """
+        if bugs is None or isinstance(bugs, cls):
+            return bugs
+        return cls(bugs)
+
+    @classmethod
+    def packBug(cls, tag, priority, text):
+        """INTERNAL. Return the fields of a bug, packed in a string."""
+        if priority is None:
+            return tag + cls.fieldSeparator + text
+        return cls.fieldSeparator.join((tag, priority, text))
+
+    def __iter__(self):
+        if not self.packed:
+            return
+        for packedBug in self.packed.split(self.bugSeparator):
+            fields = packedBug.split(self.fieldSeparator)
+            if len(fields) == 2:
+                yield (sys.intern(fields[0]), None, fields[1])
+            else:
+                yield (sys.intern(fields[0]), fields[1], fields[2])
+
+    def __len__(self):
+        if not self.packed:
+            return 0
+        return self.packed.count(self.bugSeparator) + 1
+
+    def __eq__(self, other):
+        if not isinstance(other, BugRecord):
+            return NotImplemented
+        return self.packed == other.packed
+
+    def __hash__(self):
+        return hash(self.packed)
+
+    def __repr__(self):
+        return 'BugRecord({!r})'.format(list(self))
+
+    # Pickled for the worker processes. An empty state would be skipped.
+    def __getstate__(self):
+        return (self.packed,)
+
+    def __setstate__(self, state):
+        self.packed, = state
+
+###############################################################################
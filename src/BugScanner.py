@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+###############################################################################
+# NAME:             BugScanner.py
+#
+# AUTHOR:           Ethan D. Twardy <edtwardy@mtu.edu>
+#
+# DESCRIPTION:      Finds bugs in files: comments starting with one of a set of
+#                   tags (TODO, FIXME, ...), using the comment syntax of the
+#                   language of each file. Every tag is found in a single pass
+#                   over the file, and only the lines containing one are
+#                   decoded and parsed.
+#
+# CREATED:          10/18/2026
+#
+# LAST EDITED:      10/18/2026
+###
+
+import mmap
+import os
+import re
+import sys
+
+from FileSniffer import FileSniffer
+
+###############################################################################
+# Class BugScanner
+###
+
+class BugScanner:
+    """
+    Scans files for bugs. Each bug is returned as a [tag, priority, text] list,
+    where priority is the text in parentheses after the tag, if any, as in
+    `TODO(P1): text', or None.
+    """
+
+    # Bump this whenever the results of a scan change for the same settings.
+    version = 1
+    knownTags = ('TODO', 'FIXME', 'XXX', 'HACK')
+    defaultTags = ('TODO',)
+
+    # Comment syntaxes, as tuples of (regex of the opening delimiter, closing
+    # delimiters stripped from the end of the text).
+    slashComments = (('//', ()), (r'/\*', ('*/',)))
+    hashComments = (('#', ()),)
+    # Python also has TODOs at the start of the lines of docstrings
+    pythonComments = (('#', ()),
+                      (r'^\s*(?:[rRuUbBfF]?(?:"""|\'\'\'))?', ('"""', "'''")))
+    dashComments = (('--', ()),)
+    percentComments = (('%', ()),)
+    semicolonComments = ((';+', ()),)
+    markupComments = (('<!--', ('-->',)),)
+    phpComments = slashComments + hashComments
+    # Files in languages we don't know use the comment syntaxes of C/C++,
+    # Bash, LaTeX and Lisp.
+    defaultComments = ((';;', ()), ('%', ()), ('#', ()), ('//', ()),
+                       (r'/\*', ('*/',)))
+
+    syntaxByExtension = {extension: syntax for extensions, syntax in (
+        (('.c', '.h', '.cc', '.cpp', '.cxx', '.hh', '.hpp', '.hxx', '.java',
+          '.js', '.mjs', '.jsx', '.ts', '.tsx', '.go', '.rs', '.swift', '.kt',
+          '.kts', '.scala', '.cs', '.m', '.mm', '.dart', '.css', '.scss',
+          '.less', '.groovy', '.proto'), slashComments),
+        (('.php',), phpComments),
+        (('.py', '.pyi', '.pyx'), pythonComments),
+        (('.sh', '.bash', '.zsh', '.fish', '.rb', '.pl', '.pm', '.r', '.yml',
+          '.yaml', '.toml', '.cfg', '.conf', '.mk', '.cmake', '.nix', '.tcl',
+          '.ps1'), hashComments),
+        (('.sql', '.lua', '.hs', '.elm', '.ada', '.adb', '.ads', '.vhd',
+          '.vhdl'), dashComments),
+        (('.tex', '.sty', '.cls', '.bib', '.erl', '.hrl'), percentComments),
+        (('.el', '.lisp', '.lsp', '.clj', '.cljs', '.scm', '.rkt', '.asm',
+          '.s', '.ini'), semicolonComments),
+        (('.html', '.htm', '.xml', '.xhtml', '.svg', '.md', '.markdown',
+          '.vue'), markupComments),
+    ) for extension in extensions}
+    syntaxByName = {'Makefile': hashComments, 'makefile': hashComments,
+                    'GNUmakefile': hashComments, 'Dockerfile': hashComments,
+                    'CMakeLists.txt': hashComments}
+    # The name of each syntax, which results cached by contents are keyed on
+    syntaxNames = {slashComments: 'slash', hashComments: 'hash',
+                   pythonComments: 'python', dashComments: 'dash',
+                   percentComments: 'percent', semicolonComments: 'semicolon',
+                   markupComments: 'markup', phpComments: 'php',
+                   defaultComments: 'default'}
+
+    def __init__(self, tags=defaultTags, sniffer=None):
+        """
+        Initialize a BugScanner finding the comments tagged with any of tags.
+        Files rejected by the FileSniffer sniffer are not scanned.
+        """
+        self.tags = tuple(tags)
+        self.sniffer = sniffer if sniffer is not None else FileSniffer()
+        # The tags are searched for in the raw bytes of the file, all at once.
+        self.marker = re.compile(b'|'.join(re.escape(tag.encode())
+                                           for tag in self.tags))
+        self.regexes = dict()
+
+    def getSignature(self):
+        """
+        Return a string identifying the settings that affect the result of a
+        scan. Cached results made with other settings must not be used.
+        """
+        return 'version={} tags={} maxFileSize={} skipGenerated={}'.format(
+            self.version, ','.join(self.tags), self.sniffer.maxFileSize,
+            self.sniffer.skipGenerated)
+
+    def getSyntax(self, fileName):
+        """INTERNAL. Return the comment syntax of the file `fileName'."""
+        baseName = os.path.basename(fileName)
+        if baseName in self.syntaxByName:
+            return self.syntaxByName[baseName]
+        extension = os.path.splitext(baseName)[1].lower()
+        return self.syntaxByExtension.get(extension, self.defaultComments)
+
+    def getSyntaxName(self, fileName):
+        """
+        Return the name of the comment syntax of the file `fileName'. The same
+        contents are scanned differently under names with another syntax, so
+        results cached by contents must be keyed on it.
+        """
+        return self.syntaxNames[self.getSyntax(fileName)]
+
+    def getRegex(self, syntax):
+        """
+        INTERNAL. Return the regex matching a bug in one line, for the comment
+        syntax `syntax'. Every tag is an alternative of the same regex.
+        """
+        regex = self.regexes.get(syntax)
+        if regex is None:
+            regex = re.compile(
+                '(?P<opener>' + '|'.join(opener for opener, _ in syntax)
+                + r')\s*(?P<tag>' + '|'.join(map(re.escape, self.tags))
+                + r')(?:\((?P<priority>[^)]*)\))?:\s*(?P<text>.*)')
+            self.regexes[syntax] = regex
+        return regex
+
+    def scanFile(self, fileName):
+        """
+        Return the list of bugs in the file `fileName'. If the sniffer rejects
+        the file, it is not read past its first block. Raises
+        UnicodeDecodeError if a line containing a tag cannot be decoded.
+        """
+        with open(fileName, 'rb') as inputFile:
+            if self.sniffer.check(fileName, inputFile) is not None:
+                return []
+            try:
+                contents = mmap.mmap(inputFile.fileno(), 0,
+                                     access=mmap.ACCESS_READ)
+            except ValueError:
+                return [] # Empty files cannot be mapped
+            with contents:
+                return self.scan(contents, fileName)
+
+    def scanContents(self, contents, fileName):
+        """
+        Return the list of bugs in contents, the bytes of the file `fileName'
+        already read in memory, like a blob of the object store. Contents the
+        sniffer rejects are not scanned. Raises UnicodeDecodeError like
+        scanFile.
+        """
+        if self.sniffer.checkContents(fileName, contents) is not None:
+            return []
+        return self.scan(contents, fileName)
+
+    def scan(self, contents, fileName):
+        """
+        Return the list of bugs in contents, a bytes-like object holding the
+        contents of the file `fileName'.
+        """
+        bugs = list()
+        syntax = self.getSyntax(fileName)
+        regex = self.getRegex(syntax)
+        # Only the lines containing a tag are decoded and matched against the
+        # regex, so files without any bugs never leave C.
+        hit = self.marker.search(contents)
+        while hit is not None:
+            position = hit.start()
+            start = max(contents.rfind(b'\n', 0, position),
+                        contents.rfind(b'\r', 0, position)) + 1
+            end = self.findLineEnd(contents, position)
+            bug = self.matchLine(regex, syntax, contents[start:end].decode())
+            if bug is not None:
+                bugs.append(bug)
+            hit = self.marker.search(contents, end)
+        return bugs
+
+    @staticmethod
+    def findLineEnd(contents, position):
+        """INTERNAL. Return the index of the end of the line at position."""
+        ends = [end for end in (contents.find(b'\n', position),
+                                contents.find(b'\r', position)) if end >= 0]
+        return min(ends) if ends else len(contents)
+
+    @staticmethod
+    def matchLine(regex, syntax, line):
+        """INTERNAL. Return the bug in the string `line', or None."""
+        bug = regex.search(line)
+        if bug is None:
+            return None
+        text = bug.group('text')
+        # Remove the delimiter closing the comment, as in `/* TODO: x */'
+        for opener, closers in syntax:
+            if re.fullmatch(opener, bug.group('opener')):
+                for closer in closers:
+                    if text.endswith(' ' + closer):
+                        text = text[:-len(closer) - 1]
+                        break
+                    if text.endswith(closer) and closer[0] in '"\'':
+                        text = text[:-len(closer)]
+                        break
+                break
+        # Interned, since every bug of a repository shares one of a few tags
+        return [sys.intern(bug.group('tag')), bug.group('priority'), text]
+
+    @staticmethod
+    def formatBug(bug):
+        """
+        Return the text of the bug `bug' as it appears in the bugs file. Plain
+        TODOs are written as their text alone.
+        """
+        tag, priority, text = bug
+        if tag == 'TODO' and priority is None:
+            return text
+        if priority is not None:
+            tag += '(' + priority + ')'
+        return tag + ': ' + text
+
+###############################################################################
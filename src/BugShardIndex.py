@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+###############################################################################
+# NAME:             BugShardIndex.py
+#
+# AUTHOR:           Ethan D. Twardy <edtwardy@mtu.edu>
+#
+# DESCRIPTION:      The bugs of a repository split in one file per directory,
+#                   down to a given depth, with a manifest listing them. The
+#                   bugs of a subtree are printed without reading the others,
+#                   and an update only rewrites the shards that changed.
+#
+# CREATED:          10/18/2026
+#
+# LAST EDITED:      10/18/2026
+###
+
+import heapq
+import os
+
+from BugFileWriter import BugFileWriter
+
+###############################################################################
+# Class BugShardIndex
+###
+
+class BugShardIndex:
+    """
+    A directory holding the shards of the bugs file, and its manifest. The
+    bugs of a file are kept in the shard of its directory, truncated to the
+    first `depth' components, so files nearer to the root share the shard of
+    their own directory. Each shard is in the format of the bugs file, sorted
+    by id. The manifest starts with a `# version=1 depth=N' line, followed by
+    one `<digest> <count> <shard file> <directory>' line per shard, where the
+    directory is `.' for the root of the repository.
+    """
+
+    version = 1
+    manifestName = 'manifest'
+
+    def __init__(self, directory, depth=1, temporaryDir=None):
+        """
+        Initialize a BugShardIndex stored in directory, with shards `depth'
+        directories deep. Temporary files are created in temporaryDir.
+        """
+        self.directory = directory
+        self.depth = depth
+        self.temporaryDir = temporaryDir
+        # Maps each directory to its (digest, count, shard file)
+        self.shards = dict()
+
+    @classmethod
+    def load(cls, directory, temporaryDir=None):
+        """
+        Return the BugShardIndex stored in directory, or None if there is none
+        or its manifest cannot be read.
+        """
+        try:
+            with open(os.path.join(directory, cls.manifestName)) \
+                 as manifestFile:
+                lines = manifestFile.read().splitlines()
+        except (OSError, UnicodeDecodeError):
+            return None
+        if not lines or not lines[0].startswith('#'):
+            return None
+        settings = dict(setting.partition('=')[::2]
+                        for setting in lines[0][1:].split())
+        try:
+            if int(settings.get('version', 0)) != cls.version:
+                return None
+            index = cls(directory, int(settings['depth']), temporaryDir)
+            for line in lines[1:]:
+                digest, count, shardFile, shard = line.split(' ', 3)
+                index.shards[shard] = (digest, int(count), shardFile)
+        except (KeyError, ValueError):
+            return None
+        return index
+
+    def getShard(self, fileName):
+        """
+        Return the directory of the shard holding the bugs of fileName, a
+        path relative to the root of the repository, starting with `./'.
+        """
+        components = fileName[2:].split('/')[:-1][:self.depth]
+        return '/'.join(components) if components else '.'
+
+    @staticmethod
+    def getShardFile(shard):
+        """INTERNAL. Return the name of the file of the shard of shard."""
+        if shard == '.':
+            return 'bugs'
+        return shard.replace('%', '%25').replace('/', '%2F') + '.bugs'
+
+    def write(self, tasks):
+        """
+        Replace the shards with the tasks, an iterable of (file name, text)
+        tuples. Only the shards whose contents changed are written, and those
+        left empty are removed. Return the number of shards changed.
+        """
+        shards = dict()
+        for fileName, text in tasks:
+            shards.setdefault(self.getShard(fileName), dict())[
+                BugFileWriter.getTaskDigest(text)] = text
+        os.makedirs(self.directory, exist_ok=True)
+        changed = 0
+        written = dict()
+        for shard in list(shards):
+            shardFile = self.getShardFile(shard)
+            # Only the lines of one shard are formatted at a time
+            texts = shards.pop(shard)
+            lines = [BugFileWriter.formatTask(texts[digest], digest)
+                     for digest in sorted(texts)]
+            digest = BugFileWriter.getTextDigest(lines)
+            written[shard] = (digest, len(lines), shardFile)
+            if self.shards.get(shard) == written[shard] \
+               and os.path.isfile(os.path.join(self.directory, shardFile)):
+                continue
+            BugFileWriter(os.path.join(self.directory, shardFile),
+                          self.temporaryDir).write(lines)
+            changed += 1
+        for shard in self.shards.keys() - written.keys():
+            try:
+                os.unlink(os.path.join(self.directory,
+                                       self.shards[shard][2]))
+            except FileNotFoundError:
+                pass
+            changed += 1
+        self.shards = written
+        self.writeManifest()
+        return changed
+
+    def writeManifest(self):
+        """INTERNAL. Write the manifest, if it changed."""
+        lines = ['# version={} depth={}\n'.format(self.version, self.depth)]
+        for shard in sorted(self.shards):
+            digest, count, shardFile = self.shards[shard]
+            lines.append('{} {} {} {}\n'.format(digest, count, shardFile,
+                                                shard))
+        BugFileWriter(os.path.join(self.directory, self.manifestName),
+                      self.temporaryDir).write(lines)
+
+    def remove(self):
+        """
+        Remove the shards and the manifest, and the directory if nothing else
+        is left in it. Files the manifest does not list are left alone.
+        """
+        for _, _, shardFile in self.shards.values():
+            try:
+                os.unlink(os.path.join(self.directory, shardFile))
+            except FileNotFoundError:
+                pass
+        try:
+            os.unlink(os.path.join(self.directory, self.manifestName))
+        except FileNotFoundError:
+            pass
+        self.shards = dict()
+        try:
+            os.rmdir(self.directory)
+        except OSError:
+            pass
+
+    def getShards(self, prefix=None):
+        """
+        INTERNAL. Return the directories of the shards that may hold bugs of
+        the files whose paths start with prefix, or of every file if it is
+        None.
+        """
+        if prefix is None:
+            return list(self.shards)
+        selected = list()
+        for shard in self.shards:
+            if shard == '.':
+                # Only holds the files at the root of the repository
+                if '/' not in prefix[2:]:
+                    selected.append(shard)
+                continue
+            shardPrefix = './' + shard + '/'
+            if shardPrefix.startswith(prefix) \
+               or prefix.startswith(shardPrefix):
+                selected.append(shard)
+        return selected
+
+    def getTasks(self, prefix=None):
+        """
+        Yield the (id, text) tuples of the tasks of the files whose paths
+        start with prefix, a directory ending with `/' or a file, sorted by
+        id. Only the shards that may hold them are read.
+        """
+        def readShard(shard):
+            try:
+                with open(os.path.join(self.directory,
+                                       self.shards[shard][2])) as shardFile:
+                    for line in shardFile:
+                        text, _, metadata = line.rpartition('|')
+                        text = text.strip()
+                        if prefix is not None and not (
+                                text.startswith(prefix) if prefix[-1] == '/'
+                                else text.startswith(prefix + ': ')):
+                            continue
+                        taskId = metadata.strip()
+                        if taskId.startswith('id:'):
+                            yield taskId[3:], text
+            except FileNotFoundError:
+                return
+        return heapq.merge(*(readShard(shard)
+                             for shard in self.getShards(prefix)))
+
+###############################################################################
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+###############################################################################
+# NAME:             FileSniffer.py
+#
+# AUTHOR:           Ethan D. Twardy <edtwardy@mtu.edu>
+#
+# DESCRIPTION:      Cheap checks deciding whether a file is worth scanning for
+#                   bugs, performed before any of it is decoded: a size cap,
+#                   binary detection from the first block, and detection of
+#                   minified or generated files.
+#
+# CREATED:          10/18/2026
+#
+# LAST EDITED:      10/18/2026
+###
+
+import os
+import re
+
+###############################################################################
+# Class FileSniffer
+###
+
+class FileSniffer:
+    """Decides whether a file should be skipped by the scanner."""
+
+    # Only this much of the file is read to classify it
+    blockSize = 8192
+    # Signatures of common binary formats that may not contain a NUL byte in
+    # their first block.
+    magicNumbers = (
+        b'\x89PNG', b'\xff\xd8\xff', b'GIF87a', b'GIF89a', b'%PDF-',
+        b'PK\x03\x04', b'\x1f\x8b', b'\x7fELF', b'BZh', b'\xfd7zXZ\x00',
+        b'7z\xbc\xaf\x27\x1c', b'\x28\xb5\x2f\xfd', b'\xca\xfe\xba\xbe',
+        b'\xfe\xed\xfa\xce', b'\xfe\xed\xfa\xcf', b'\xcf\xfa\xed\xfe',
+        b'\x00asm', b'SQLite format 3\x00', b'OggS', b'ID3', b'RIFF',
+    )
+    # Names of files that are produced by tools rather than written by hand
+    generatedNames = re.compile(r'.*(\.min\.(js|css)|\.map|\.lock|-lock\.json'
+                                r'|\.pb\.go|_pb2\.py)$')
+    # Markers conventionally placed in the first lines of generated files
+    markerLines = 10
+    generatedMarkers = re.compile(rb'@generated|DO NOT EDIT|Code generated .*'
+                                  rb'by|Autogenerated|auto-generated',
+                                  re.IGNORECASE)
+    # A line this long in the first block means the file is minified
+    maxLineLength = 1000
+
+    def __init__(self, maxFileSize=8 * 1024 * 1024, skipGenerated=True):
+        """
+        Initialize a FileSniffer. Files larger than maxFileSize bytes are
+        skipped, unless it is 0. Minified and generated files are skipped
+        unless skipGenerated is False.
+        """
+        self.maxFileSize = maxFileSize
+        self.skipGenerated = skipGenerated
+
+    def isGeneratedName(self, fileName):
+        """Return True if `fileName' is skipped because of its name alone."""
+        return self.skipGenerated \
+            and self.generatedNames.match(fileName) is not None
+
+    def check(self, fileName, inputFile):
+        """
+        Return the reason why the file `fileName', open in binary mode as
+        inputFile, should not be scanned, or None if it should be. At most one
+        block of the file is read.
+        """
+        if self.isGeneratedName(fileName):
+            return 'generated'
+        size = os.fstat(inputFile.fileno()).st_size
+        if self.maxFileSize and size > self.maxFileSize:
+            return 'too large'
+        header = os.pread(inputFile.fileno(), self.blockSize, 0) \
+            if hasattr(os, 'pread') else inputFile.read(self.blockSize)
+        return self.checkHeader(header)
+
+    def checkContents(self, fileName, contents):
+        """
+        Like check, for a file whose contents are already in memory, like a
+        blob read from the object store.
+        """
+        if self.isGeneratedName(fileName):
+            return 'generated'
+        if self.maxFileSize and len(contents) > self.maxFileSize:
+            return 'too large'
+        return self.checkHeader(contents[:self.blockSize])
+
+    def checkHeader(self, header):
+        """INTERNAL. Classify a file from its first block, header."""
+        if b'\x00' in header or header.startswith(self.magicNumbers):
+            return 'binary'
+        if self.skipGenerated:
+            lines = header.splitlines()
+            if any(map(self.generatedMarkers.search,
+                       lines[:self.markerLines])):
+                return 'generated'
+            if max(map(len, lines), default=0) > self.maxLineLength:
+                return 'minified'
+        return None
+
+###############################################################################
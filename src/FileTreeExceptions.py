@@ -8,7 +8,7 @@
 #
 # CREATED:          07/18/2019
 #
-# LAST EDITED:      07/18/2019
+# LAST EDITED:      10/18/2026
 ###
 
 #pylint: disable=unnecessary-pass
@@ -20,7 +20,7 @@ class NoContainingFileTreeException(Exception):
     """
     pass
 
-class NotValidFileTreeRootException(Exception):
+class NotAValidFileTreeRootException(Exception):
     """
     This exception is thrown when a FileTree cannot be constructed from the
     path supplied.
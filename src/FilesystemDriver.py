@@ -5,10 +5,13 @@
 #
 # DESCRIPTION:      An abstraction layer for functions that manipulate the
 #                   native filesystem. This is employed to facilitate testing.
+#                   The tree classes call these functions through the module,
+#                   so test/TestFilesystemDriver.py can replace them with an
+#                   in-memory filesystem.
 #
 # CREATED:          07/27/2019
 #
-# LAST EDITED:      07/27/2019
+# LAST EDITED:      10/18/2026
 ###
 
 import os
@@ -20,6 +23,13 @@ def listdir(path='.'):
     """List the contents of a directory."""
     return os.listdir(path)
 
+def scandir(path='.'):
+    """
+    Return an iterator of the entries of a directory, with their name, path,
+    is_dir() and is_symlink(), like os.scandir. Usable as a context manager.
+    """
+    return os.scandir(path)
+
 def abspath(path):
     """Return a normalized absolutized version of the pathname path."""
     return os.path.abspath(path)
@@ -28,16 +38,36 @@ def basename(path):
     """Return the basename of the pathname path."""
     return os.path.basename(path)
 
+def dirname(path):
+    """Return the directory name of the pathname path."""
+    return os.path.dirname(path)
+
 def isdir(path):
     """Return True if path is an existing directory."""
     return os.path.isdir(path)
 
+def isfile(path):
+    """Return True if path is an existing regular file."""
+    return os.path.isfile(path)
+
+def lexists(path):
+    """Return True if path exists, even as a broken symbolic link."""
+    return os.path.lexists(path)
+
+def readFile(path):
+    """
+    Return the contents of the text file at path. Raises OSError if it cannot
+    be read, and UnicodeDecodeError if it is not text.
+    """
+    with open(path, 'r') as inputFile:
+        return inputFile.read()
+
 def join(path):
     """Join one or more path components intelligently."""
     return os.sep.join(path)
 
 def split(path):
     """Split path into a list of path components using the native separator."""
-    return os.sep.split(path)
+    return path.split(os.sep)
 
 ###############################################################################
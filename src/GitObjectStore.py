@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+###############################################################################
+# NAME:             GitObjectStore.py
+#
+# AUTHOR:           Ethan D. Twardy <edtwardy@mtu.edu>
+#
+# DESCRIPTION:      Reads commits, trees and blobs straight from the object
+#                   store of a git repository: loose objects and packfiles with
+#                   their .idx files, including deltified objects. No checkout
+#                   and no git process are needed, so it works on bare mirrors.
+#
+# CREATED:          10/18/2026
+#
+# LAST EDITED:      10/18/2026
+###
+
+import mmap
+import os
+import re
+import struct
+import zlib
+
+from RepositoryExceptions import InvalidObjectException, \
+    UnknownRevisionException
+
+###############################################################################
+# Class GitPack
+###
+
+class GitPack:
+    """A packfile and its index, mapped into memory."""
+
+    # Object types, as stored in the header of each packed object
+    objectTypes = {1: 'commit', 2: 'tree', 3: 'blob', 4: 'tag'}
+    typeOffsetDelta = 6
+    typeReferenceDelta = 7
+
+    def __init__(self, indexFilename):
+        """Initialize a GitPack from the path of its .idx file."""
+        self.packFilename = indexFilename[:-len('.idx')] + '.pack'
+        with open(indexFilename, 'rb') as indexFile:
+            self.index = indexFile.read()
+        with open(self.packFilename, 'rb') as packFile:
+            self.pack = mmap.mmap(packFile.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        if self.index[:4] == b'\377tOc':
+            if struct.unpack('>I', self.index[4:8])[0] != 2:
+                raise InvalidObjectException('Unsupported pack index version')
+            self.fanoutStart = 8
+            self.count = struct.unpack_from('>I', self.index,
+                                            self.fanoutStart + 255 * 4)[0]
+            self.namesStart = self.fanoutStart + 256 * 4
+            self.namesStride = 20
+            self.namesOffset = 0
+            # Names, then CRCs, then 32 bit offsets, then 64 bit offsets
+            self.offsetsStart = self.namesStart + self.count * 24
+            self.largeOffsetsStart = self.offsetsStart + self.count * 4
+        else:
+            # Version 1: each name is preceded by its offset
+            self.fanoutStart = 0
+            self.count = struct.unpack_from('>I', self.index, 255 * 4)[0]
+            self.namesStart = 256 * 4
+            self.namesStride = 24
+            self.namesOffset = 4
+            self.offsetsStart = None
+
+    def getName(self, position):
+        """INTERNAL. Return the binary SHA of the object at position."""
+        start = self.namesStart + position * self.namesStride \
+            + self.namesOffset
+        return self.index[start:start + 20]
+
+    def getRange(self, firstByte):
+        """INTERNAL. Return the index range of SHAs starting with firstByte."""
+        end = struct.unpack_from('>I', self.index,
+                                 self.fanoutStart + firstByte * 4)[0]
+        start = struct.unpack_from('>I', self.index,
+                                   self.fanoutStart + (firstByte - 1) * 4)[0] \
+            if firstByte else 0
+        return start, end
+
+    def findPosition(self, name):
+        """
+        INTERNAL. Return the position in the index of the first object whose
+        binary SHA is not smaller than name.
+        """
+        low, high = self.getRange(name[0])
+        while low < high:
+            middle = (low + high) // 2
+            if self.getName(middle) < name:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def findOffset(self, name):
+        """Return the offset of the object with the binary SHA name or None."""
+        position = self.findPosition(name)
+        if position >= self.count or self.getName(position) != name:
+            return None
+        if self.offsetsStart is None:
+            start = self.namesStart + position * self.namesStride
+            return struct.unpack_from('>I', self.index, start)[0]
+        offset = struct.unpack_from('>I', self.index,
+                                    self.offsetsStart + position * 4)[0]
+        if offset & 0x80000000:
+            offset = struct.unpack_from(
+                '>Q', self.index,
+                self.largeOffsetsStart + (offset & 0x7fffffff) * 8)[0]
+        return offset
+
+    def findPrefix(self, prefix):
+        """Return the hex SHAs of the objects starting with the hex prefix."""
+        low = bytes.fromhex(prefix.ljust(40, '0'))
+        names = list()
+        position = self.findPosition(low)
+        while position < self.count:
+            name = self.getName(position).hex()
+            if not name.startswith(prefix):
+                break
+            names.append(name)
+            position += 1
+        return names
+
+    def readHeader(self, offset):
+        """
+        INTERNAL. Parse the header of the object at offset. Return its type
+        number, its size, and the offset of the data following the header.
+        """
+        byte = self.pack[offset]
+        objectType = (byte >> 4) & 7
+        size = byte & 15
+        shift = 4
+        offset += 1
+        while byte & 0x80:
+            byte = self.pack[offset]
+            size |= (byte & 0x7f) << shift
+            shift += 7
+            offset += 1
+        return objectType, size, offset
+
+    def inflate(self, offset, size):
+        """INTERNAL. Decompress the zlib stream at offset, of size bytes."""
+        decompressor = zlib.decompressobj()
+        chunks = list()
+        chunkSize = max(4096, size + 64)
+        while not decompressor.eof:
+            chunk = self.pack[offset:offset + chunkSize]
+            if not chunk:
+                raise InvalidObjectException('Truncated object in '
+                                             + self.packFilename)
+            chunks.append(decompressor.decompress(chunk))
+            offset += chunkSize
+        return b''.join(chunks)
+
+    def close(self):
+        """Unmap the packfile."""
+        self.pack.close()
+
+###############################################################################
+# Class GitObjectStore
+###
+
+class GitObjectStore:
+    """
+    Reads the objects of a git repository. Objects are returned as a tuple of
+    their type ('commit', 'tree', 'blob' or 'tag') and their contents.
+    """
+
+    # Bases of deltified objects are kept, since they are usually shared by
+    # the objects that come next in the pack.
+    baseCacheSize = 256
+    modeGitlink = 0o160000
+    modeSymlink = 0o120000
+    modeTree = 0o040000
+    # What a ref must hold, once symbolic refs have been followed
+    shaPattern = re.compile(r'[0-9a-f]{40}')
+
+    def __init__(self, gitDir, commonDir=None):
+        """
+        Initialize a GitObjectStore reading the repository whose git directory
+        is gitDir. commonDir holds the objects and refs shared by the
+        worktrees of the repository, it is gitDir if it is None.
+        """
+        self.gitDir = gitDir
+        self.commonDir = commonDir or gitDir
+        self.objectDirs = self.findObjectDirs(
+            os.path.join(self.commonDir, 'objects'))
+        self.packs = None
+        self.baseCache = dict()
+
+    @staticmethod
+    def findObjectDirs(objectDir):
+        """
+        INTERNAL. Return objectDir, followed by the object directories it
+        borrows objects from, listed in its info/alternates file.
+        """
+        objectDirs = [objectDir]
+        position = 0
+        while position < len(objectDirs):
+            try:
+                with open(os.path.join(objectDirs[position], 'info',
+                                       'alternates'), 'r') as alternates:
+                    lines = alternates.read().splitlines()
+            except (OSError, UnicodeDecodeError):
+                lines = []
+            for line in lines:
+                if line and not line.startswith('#'):
+                    alternate = os.path.normpath(
+                        os.path.join(objectDirs[position], line))
+                    if alternate not in objectDirs:
+                        objectDirs.append(alternate)
+            position += 1
+        return objectDirs
+
+    def getPacks(self):
+        """INTERNAL. Return the list of the packs of the repository."""
+        if self.packs is None:
+            self.packs = list()
+            for objectDir in self.objectDirs:
+                packDir = os.path.join(objectDir, 'pack')
+                try:
+                    names = sorted(os.listdir(packDir))
+                except OSError:
+                    continue
+                for name in names:
+                    if name.endswith('.idx'):
+                        try:
+                            self.packs.append(
+                                GitPack(os.path.join(packDir, name)))
+                        except (OSError, ValueError, struct.error):
+                            continue # Being written, or removed under us
+        return self.packs
+
+    def readObject(self, sha):
+        """
+        Return the type and the contents of the object with the hex SHA sha.
+        Raises InvalidObjectException if there is no such object.
+        """
+        for objectDir in self.objectDirs:
+            try:
+                with open(os.path.join(objectDir, sha[:2], sha[2:]),
+                          'rb') as objectFile:
+                    data = zlib.decompress(objectFile.read())
+            except FileNotFoundError:
+                continue
+            except (OSError, zlib.error):
+                raise InvalidObjectException('Cannot read object ' + sha)
+            header, _, contents = data.partition(b'\0')
+            return header.split(b' ')[0].decode(), contents
+        name = bytes.fromhex(sha)
+        for pack in self.getPacks():
+            offset = pack.findOffset(name)
+            if offset is not None:
+                return self.readPacked(pack, offset)
+        raise InvalidObjectException('No object ' + sha)
+
+    def readPacked(self, pack, offset):
+        """INTERNAL. Return the type and contents of a packed object."""
+        cached = self.baseCache.get((pack.packFilename, offset))
+        if cached is not None:
+            return cached
+        objectType, size, dataOffset = pack.readHeader(offset)
+        if objectType in GitPack.objectTypes:
+            result = (GitPack.objectTypes[objectType],
+                      pack.inflate(dataOffset, size))
+        elif objectType == GitPack.typeOffsetDelta:
+            byte = pack.pack[dataOffset]
+            dataOffset += 1
+            distance = byte & 0x7f
+            while byte & 0x80:
+                byte = pack.pack[dataOffset]
+                dataOffset += 1
+                distance = ((distance + 1) << 7) | (byte & 0x7f)
+            baseType, base = self.readPacked(pack, offset - distance)
+            result = (baseType,
+                      self.applyDelta(base, pack.inflate(dataOffset, size)))
+        elif objectType == GitPack.typeReferenceDelta:
+            baseSha = pack.pack[dataOffset:dataOffset + 20].hex()
+            baseType, base = self.readObject(baseSha)
+            result = (baseType, self.applyDelta(
+                base, pack.inflate(dataOffset + 20, size)))
+        else:
+            raise InvalidObjectException('Unknown object type {} in {}'.format(
+                objectType, pack.packFilename))
+        if len(self.baseCache) >= self.baseCacheSize:
+            self.baseCache.pop(next(iter(self.baseCache)))
+        self.baseCache[(pack.packFilename, offset)] = result
+        return result
+
+    @staticmethod
+    def applyDelta(base, delta):
+        """INTERNAL. Return the object made by applying delta to base."""
+        def readSize(position):
+            size = 0
+            shift = 0
+            while True:
+                byte = delta[position]
+                position += 1
+                size |= (byte & 0x7f) << shift
+                shift += 7
+                if not byte & 0x80:
+                    return size, position
+        baseSize, position = readSize(0)
+        resultSize, position = readSize(position)
+        if baseSize != len(base):
+            raise InvalidObjectException('Delta does not apply to its base')
+        result = bytearray()
+        while position < len(delta):
+            instruction = delta[position]
+            position += 1
+            if instruction & 0x80:
+                # Copy a range of the base
+                copyOffset = 0
+                copySize = 0
+                for bit in range(4):
+                    if instruction & (1 << bit):
+                        copyOffset |= delta[position] << (8 * bit)
+                        position += 1
+                for bit in range(3):
+                    if instruction & (16 << bit):
+                        copySize |= delta[position] << (8 * bit)
+                        position += 1
+                result += base[copyOffset:copyOffset + (copySize or 0x10000)]
+            elif instruction:
+                # Insert the next bytes of the delta
+                result += delta[position:position + instruction]
+                position += instruction
+            else:
+                raise InvalidObjectException('Invalid delta instruction')
+        if len(result) != resultSize:
+            raise InvalidObjectException('Delta produced the wrong size')
+        return bytes(result)
+
+    def readRef(self, name):
+        """
+        INTERNAL. Return the hex SHA the ref name points to, following
+        symbolic refs, or None if there is no such ref. Files of the git
+        directory that do not hold a SHA, like config, are not refs.
+        """
+        for _ in range(10): # Symbolic refs may not form a loop
+            value = None
+            # HEAD and the other per-worktree refs are in gitDir
+            for directory in (self.gitDir, self.commonDir):
+                try:
+                    with open(os.path.join(directory, name), 'r') as refFile:
+                        value = refFile.readline().strip()
+                    break
+                except (OSError, UnicodeDecodeError):
+                    continue
+            if value is None:
+                value = self.readPackedRef(name)
+            if value is None or not value.startswith('ref:'):
+                return value if self.isSha(value) else None
+            name = value[len('ref:'):].strip()
+        return None
+
+    def isSha(self, value):
+        """INTERNAL. Return True if value is a full hex SHA."""
+        return value is not None and self.shaPattern.fullmatch(value) \
+            is not None
+
+    def readPackedRef(self, name):
+        """INTERNAL. Return the hex SHA of name in packed-refs, or None."""
+        try:
+            with open(os.path.join(self.commonDir, 'packed-refs'),
+                      'r') as packedRefs:
+                for line in packedRefs:
+                    if line[:1] in ('#', '^'):
+                        continue
+                    sha, _, refName = line.strip().partition(' ')
+                    if refName == name:
+                        return sha
+        except (OSError, UnicodeDecodeError):
+            pass
+        return None
+
+    def findPrefix(self, prefix):
+        """INTERNAL. Return the hex SHAs of the objects matching prefix."""
+        names = set()
+        for objectDir in self.objectDirs:
+            try:
+                names.update(prefix[:2] + name
+                             for name in os.listdir(os.path.join(objectDir,
+                                                                 prefix[:2]))
+                             if name.startswith(prefix[2:]))
+            except OSError:
+                pass
+        for pack in self.getPacks():
+            names.update(pack.findPrefix(prefix))
+        return names
+
+    def resolveRevision(self, revision):
+        """
+        Return the hex SHA of the commit named by revision: a full or
+        abbreviated SHA, HEAD, or the name of a branch, tag or remote branch,
+        optionally followed by ancestry suffixes like ~2 or ^2. Annotated tags
+        are peeled. Raises UnknownRevisionException.
+        """
+        match = re.fullmatch(r'(.+?)((?:[~^][0-9]*)*)', revision)
+        if match is None:
+            raise UnknownRevisionException('Unknown revision ' + revision)
+        sha = self.resolveName(match.group(1))
+        for operator, count in re.findall(r'([~^])([0-9]*)', match.group(2)):
+            count = int(count) if count else 1
+            try:
+                if operator == '~':
+                    for _ in range(count):
+                        sha = self.getParents(sha)[0]
+                elif count:
+                    sha = self.getParents(sha)[count - 1]
+            except IndexError:
+                raise UnknownRevisionException('Unknown revision '
+                                               + revision)
+        return sha
+
+    def resolveName(self, name):
+        """
+        INTERNAL. Return the hex SHA of the commit named by name, a SHA or the
+        name of a ref.
+        """
+        sha = None
+        for refName in (name, 'refs/' + name, 'refs/tags/' + name,
+                        'refs/heads/' + name, 'refs/remotes/' + name,
+                        'refs/remotes/' + name + '/HEAD'):
+            if os.path.isabs(refName) or '..' in refName.split('/'):
+                break # Don't read files outside of the git directory
+            sha = self.readRef(refName)
+            if sha is not None:
+                break
+        if sha is None and 4 <= len(name) <= 40 \
+           and all(c in '0123456789abcdef' for c in name.lower()):
+            names = self.findPrefix(name.lower())
+            if len(names) > 1:
+                raise UnknownRevisionException('Ambiguous revision ' + name)
+            sha = names.pop() if names else None
+        if sha is None:
+            raise UnknownRevisionException('Unknown revision ' + name)
+        try:
+            objectType, contents = self.readObject(sha)
+            while objectType == 'tag':
+                sha = contents.split(b'\n', 1)[0].split(b' ')[1].decode()
+                if not self.isSha(sha):
+                    raise InvalidObjectException('Invalid tag ' + name)
+                objectType, contents = self.readObject(sha)
+        except (InvalidObjectException, IndexError,
+                UnicodeDecodeError) as error:
+            raise UnknownRevisionException(str(error))
+        if objectType != 'commit':
+            raise UnknownRevisionException(name + ' is not a commit')
+        return sha
+
+    def readCommit(self, commit):
+        """
+        Return the headers of the commit with the SHA commit, as a list of
+        (name, value) tuples in order, and its message.
+        """
+        objectType, contents = self.readObject(commit)
+        if objectType != 'commit':
+            raise InvalidObjectException(commit + ' is not a commit')
+        header, _, message = contents.partition(b'\n\n')
+        headers = list()
+        for line in header.split(b'\n'):
+            if line.startswith(b' ') and headers:
+                # Continuation of a multi-line header, like a signature
+                name, value = headers[-1]
+                headers[-1] = (name, value + '\n' + line[1:].decode(
+                    'utf-8', 'replace'))
+                continue
+            name, _, value = line.partition(b' ')
+            headers.append((name.decode(), value.decode('utf-8', 'replace')))
+        return headers, message.decode('utf-8', 'replace')
+
+    def getParents(self, commit):
+        """Return the hex SHAs of the parents of the commit with SHA commit."""
+        headers, _ = self.readCommit(commit)
+        return [value for name, value in headers if name == 'parent']
+
+    def getTree(self, commit):
+        """Return the hex SHA of the tree of the commit with the SHA commit."""
+        headers, _ = self.readCommit(commit)
+        if not headers or headers[0][0] != 'tree':
+            raise InvalidObjectException(commit + ' has no tree')
+        return headers[0][1]
+
+    def readTree(self, sha):
+        """Return the list of (mode, name, hex SHA) entries of the tree sha."""
+        objectType, contents = self.readObject(sha)
+        if objectType != 'tree':
+            raise InvalidObjectException(sha + ' is not a tree')
+        entries = list()
+        position = 0
+        while position < len(contents):
+            space = contents.index(b' ', position)
+            nul = contents.index(b'\0', space)
+            mode = int(contents[position:space], 8)
+            name = contents[space + 1:nul].decode('utf-8', 'surrogateescape')
+            entries.append((mode, name, contents[nul + 1:nul + 21].hex()))
+            position = nul + 21
+        return entries
+
+    def listFiles(self, tree):
+        """
+        Return a dict mapping the path of every regular file of the tree with
+        the SHA tree, relative to its root, to the SHA of its blob. Like the
+        index, symbolic links and submodules are left out.
+        """
+        files = dict()
+        stack = [('', tree)]
+        while stack:
+            prefix, sha = stack.pop()
+            for mode, name, entrySha in self.readTree(sha):
+                path = prefix + name
+                if mode & 0o170000 == self.modeTree:
+                    stack.append((path + '/', entrySha))
+                elif mode & 0o170000 not in (self.modeGitlink,
+                                             self.modeSymlink):
+                    files[path] = entrySha
+        return dict(sorted(files.items()))
+
+    def close(self):
+        """Release the packs of the repository."""
+        for pack in self.packs or []:
+            pack.close()
+        self.packs = None
+
+###############################################################################
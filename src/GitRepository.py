@@ -4,29 +4,379 @@
 #
 # AUTHOR:           Ethan D. Twardy <edtwardy@mtu.edu>
 #
-# DESCRIPTION:      
+# DESCRIPTION:      Concrete implementation of the IRepository class for git.
+#                   The index file is parsed directly, without running git.
 #
 # CREATED:          07/18/2019
 #
-# LAST EDITED:      07/18/2019
+# LAST EDITED:      10/18/2026
 ###
 
+from bisect import bisect_left
+from collections import namedtuple
 import os
+import struct
 
+import FilesystemDriver
 from IRepository import IRepository
-from RepositoryExceptions import NotAValidRepositoryException
+from RepositoryLocator import RepositoryLocator
+from RepositoryExceptions import NotAValidRepositoryException, \
+    InvalidIndexException
+
+# One entry of the git index. See Documentation/gitformat-index.txt in git.
+GitIndexEntry = namedtuple('GitIndexEntry', ['path', 'sha', 'mode', 'mtime',
+                                             'size', 'ino', 'stage',
+                                             'skipWorktree'])
+# One directory of the cache tree extension of the index. sha is the SHA of
+# the tree the directory would have if the index was committed, or None if it
+# has been invalidated by a change below it.
+GitCacheTree = namedtuple('GitCacheTree', ['sha', 'children'])
 
 class GitRepository(IRepository):
     """
     Concrete implementation of the IRepository abstract class representing
     Git repositories.
     """
+    # Object types stored in the mode of an index entry
+    modeTypeMask = 0o170000
+    modeRegularFile = 0o100000
+    modeSymlink = 0o120000
+    modeGitlink = 0o160000
+
     def __init__(self, path):
         super()
-        for name in os.listdir(path):
-            if name == '.git':
-                self.path = os.path.abspath(path)
+        self.gitDir = self.findGitDir(path)
+        if self.gitDir is None:
+            raise NotAValidRepositoryException()
+        self.path = FilesystemDriver.abspath(path)
+        self.commonDir = self.findCommonDir(self.gitDir)
+        self.index = None
+        self.indexMtime = None
+        self.cacheTree = None
+
+    @staticmethod
+    def findGitDir(path):
+        """
+        Return the git directory of the working tree at path, or None if it is
+        not the root of one. Submodules and worktrees have a .git file holding
+        the path of their git directory, instead of a .git directory. The
+        working tree of GIT_DIR uses it, whether it has a .git or not.
+        """
+        environmentGitDir = os.environ.get('GIT_DIR')
+        if environmentGitDir and FilesystemDriver.abspath(path) \
+           == RepositoryLocator.getEnvironmentWorkTree():
+            return FilesystemDriver.abspath(environmentGitDir) \
+                if FilesystemDriver.isdir(environmentGitDir) else None
+        dotGit = os.path.join(path, '.git')
+        if FilesystemDriver.isdir(dotGit):
+            return FilesystemDriver.abspath(dotGit)
+        try:
+            lines = FilesystemDriver.readFile(dotGit).splitlines()
+        except (OSError, UnicodeDecodeError):
+            return None
+        line = lines[0].strip() if lines else ''
+        if not line.startswith('gitdir:'):
+            return None
+        gitDir = os.path.join(path, line[len('gitdir:'):].strip())
+        return FilesystemDriver.abspath(gitDir) \
+            if FilesystemDriver.isdir(gitDir) else None
+
+    @staticmethod
+    def findBareRepository(path):
+        """
+        Return the root of the bare repository containing the directory path,
+        or None if it is not in one.
+        """
+        path = FilesystemDriver.abspath(path)
+        while True:
+            if FilesystemDriver.isfile(os.path.join(path, 'HEAD')) \
+               and FilesystemDriver.isdir(os.path.join(path, 'objects')) \
+               and FilesystemDriver.isdir(os.path.join(path, 'refs')):
+                return path
+            parent = FilesystemDriver.dirname(path)
+            if parent == path:
+                return None
+            path = parent
+
+    @staticmethod
+    def findCommonDir(gitDir):
+        """
+        Return the directory holding the files shared by every worktree of the
+        git directory gitDir, like info/exclude. It is gitDir itself, unless
+        gitDir belongs to a linked worktree.
+        """
+        try:
+            commonDir = FilesystemDriver.readFile(
+                os.path.join(gitDir, 'commondir')).strip()
+        except (OSError, UnicodeDecodeError):
+            return gitDir
+        return FilesystemDriver.abspath(os.path.join(gitDir, commonDir))
+
+    @staticmethod
+    def findIndexFile(path, gitDir):
+        """
+        Return the path of the index file of the working tree at path, whose
+        git directory is gitDir. The hooks of `git commit -a' and `git commit
+        PATH' are given a temporary index in GIT_INDEX_FILE, relative to the
+        current directory, for the working tree containing it.
+        """
+        environmentIndex = os.environ.get('GIT_INDEX_FILE')
+        if environmentIndex and FilesystemDriver.abspath(path) \
+           == RepositoryLocator.findRoot('.'):
+            return FilesystemDriver.abspath(environmentIndex)
+        return os.path.join(gitDir, 'index')
+
+    def getSubmodules(self):
+        """
+        Return the paths of the submodules listed in the .gitmodules file of
+        the repository, relative to its root, that have been checked out.
+        """
+        try:
+            lines = FilesystemDriver.readFile(
+                os.path.join(self.path, '.gitmodules')).splitlines()
+        except (OSError, UnicodeDecodeError):
+            return []
+        submodules = list()
+        inSubmodule = False
+        for line in lines:
+            line = line.strip()
+            if not line or line[0] in '#;':
+                continue
+            if line.startswith('['):
+                inSubmodule = line[1:].lstrip().startswith('submodule')
+                continue
+            key, _, value = line.partition('=')
+            if not inSubmodule or key.strip().lower() != 'path':
+                continue
+            path = value.strip()
+            if len(path) > 1 and path[0] == path[-1] == '"':
+                path = path[1:-1]
+            path = path.strip('/')
+            if path and self.findGitDir(os.path.join(self.path, path)) \
+               and path not in submodules:
+                submodules.append(path)
+        return submodules
+
+    def getTrackedFiles(self):
+        """
+        Return the list of the paths of the regular files tracked in the
+        index, relative to the root of the repository. Return None if the index
+        does not exist or cannot be used, in which case the working tree has
+        to be walked instead.
+        """
+        try:
+            entries = self.readIndex()
+        except (OSError, InvalidIndexException):
+            return None
+        tracked = list()
+        for entry in entries:
+            # Conflicted paths appear once per stage, only keep the first
+            if tracked and tracked[-1] == entry.path:
+                continue
+            if entry.skipWorktree \
+               or entry.mode & self.modeTypeMask != self.modeRegularFile:
+                continue # Not checked out, submodules and symbolic links
+            tracked.append(entry.path)
+        return tracked
+
+    def getIndexEntries(self):
+        """
+        Return a dict mapping the path of each file tracked in the index to its
+        GitIndexEntry, or an empty dict if the index cannot be read.
+        """
+        try:
+            entries = self.readIndex()
+        except (OSError, InvalidIndexException):
+            return dict()
+        return {entry.path: entry for entry in entries if entry.stage == 0}
+
+    def isUnchanged(self, entry, statResult):
+        """
+        Return True if the file with the stat data statResult is known to have
+        the contents of the blob of the GitIndexEntry entry. Like git, a file
+        modified in the same instant the index was written is not trusted.
+        """
+        return entry.mtime == statResult.st_mtime_ns \
+            and entry.size == statResult.st_size & 0xffffffff \
+            and entry.ino == statResult.st_ino & 0xffffffff \
+            and statResult.st_mtime_ns < self.indexMtime
+
+    def diffIndex(self, store, tree):
+        """
+        Return a dict mapping the path of every regular file whose staged blob
+        differs from its blob in the tree with the SHA tree, read from the
+        GitObjectStore store, to the SHA of the staged blob, or None if the
+        file is not staged. tree may be None, before the first commit. The
+        directories the cache tree of the index knows to be unchanged are not
+        compared, so only the directories with staged changes are read.
+        """
+        entries = [entry for entry in self.readIndex() if entry.stage == 0]
+        paths = [entry.path for entry in entries]
+        changes = dict()
+        def compareDirectory(prefix, cacheTree, treeSha):
+            if cacheTree is not None and cacheTree.sha is not None \
+               and cacheTree.sha == treeSha:
                 return
-        raise NotAValidRepositoryException()
+            treeFiles = dict()
+            treeDirectories = dict()
+            for mode, name, sha in store.readTree(treeSha) if treeSha else []:
+                if mode & self.modeTypeMask == self.modeRegularFile:
+                    treeFiles[name] = sha
+                elif mode & self.modeTypeMask == 0o040000:
+                    treeDirectories[name] = sha
+            # The entries directly in this directory, skipping over the
+            # entries of each subdirectory at once.
+            indexFiles = dict()
+            indexDirectories = set()
+            position = bisect_left(paths, prefix)
+            while position < len(paths) and paths[position].startswith(prefix):
+                name = paths[position][len(prefix):]
+                slash = name.find('/')
+                if slash >= 0:
+                    name = name[:slash]
+                    indexDirectories.add(name)
+                    # '0' is the character after '/'
+                    position = bisect_left(paths, prefix + name + '0',
+                                           position)
+                    continue
+                entry = entries[position]
+                if entry.mode & self.modeTypeMask == self.modeRegularFile:
+                    indexFiles[name] = entry.sha
+                position += 1
+            for name in indexFiles.keys() | treeFiles.keys():
+                if indexFiles.get(name) != treeFiles.get(name):
+                    changes[prefix + name] = indexFiles.get(name)
+            for name in indexDirectories | treeDirectories.keys():
+                compareDirectory(prefix + name + '/',
+                                 cacheTree.children.get(name)
+                                 if cacheTree is not None else None,
+                                 treeDirectories.get(name))
+        compareDirectory('', self.getCacheTree(), tree)
+        return changes
+
+    def getCacheTree(self):
+        """
+        Return the GitCacheTree of the root of the index, or None if the index
+        has no cache tree extension.
+        """
+        try:
+            self.readIndex()
+        except (OSError, InvalidIndexException):
+            return None
+        return self.cacheTree
+
+    def readIndex(self):
+        """
+        Parse the index file of the repository, returning the list of its
+        entries in index order, that is sorted by path. Versions 2 through 4 of
+        the format are supported. The result is kept for the lifetime of this
+        object.
+        """
+        if self.index is not None:
+            return self.index
+        with open(self.findIndexFile(self.path, self.gitDir),
+                  'rb') as indexFile:
+            self.indexMtime = os.fstat(indexFile.fileno()).st_mtime_ns
+            data = indexFile.read()
+        if len(data) < 12 or data[:4] != b'DIRC':
+            raise InvalidIndexException('Bad index signature')
+        version, count = struct.unpack_from('>II', data, 4)
+        if version not in (2, 3, 4):
+            raise InvalidIndexException(
+                'Unsupported index version {}'.format(version))
+
+        entries = list()
+        position = 12
+        path = b''
+        try:
+            for _ in range(count):
+                start = position
+                fields = struct.unpack_from('>10I20sH', data, position)
+                position += 62
+                flags = fields[11]
+                extendedFlags = 0
+                if version >= 3 and flags & 0x4000:
+                    extendedFlags, = struct.unpack_from('>H', data, position)
+                    position += 2
+                if version == 4:
+                    # The path is stored as the number of bytes to remove from
+                    # the end of the previous path, and a suffix to append.
+                    strip, position = self.readVarint(data, position)
+                    end = data.index(b'\0', position)
+                    path = path[:len(path) - strip] + data[position:end]
+                    position = end + 1
+                else:
+                    end = data.index(b'\0', position)
+                    path = data[position:end]
+                    # Entries are padded with 1-8 NULs to a multiple of eight
+                    position = start + ((end - start + 8) & ~7)
+                entries.append(GitIndexEntry(
+                    path=path.decode('utf-8', 'surrogateescape'),
+                    sha=fields[10].hex(), mode=fields[6],
+                    mtime=fields[2] * 1000000000 + fields[3],
+                    size=fields[9], ino=fields[5], stage=(flags >> 12) & 3,
+                    skipWorktree=bool(extendedFlags & 0x4000)))
+        except (struct.error, ValueError):
+            raise InvalidIndexException('Truncated index')
+
+        # A split or sparse index does not list every file in the main index
+        self.cacheTree = None
+        while position + 8 <= len(data) - 20:
+            signature, size = struct.unpack_from('>4sI', data, position)
+            if signature in (b'link', b'sdir'):
+                raise InvalidIndexException(
+                    'Unsupported index extension {}'.format(signature))
+            if signature == b'TREE':
+                try:
+                    self.cacheTree = self.parseCacheTree(
+                        data[position + 8:position + 8 + size])
+                except (ValueError, IndexError):
+                    self.cacheTree = None # Only an optimization
+            position += 8 + size
+        self.index = entries
+        return entries
+
+    @staticmethod
+    def parseCacheTree(data):
+        """
+        INTERNAL. Parse the data of the cache tree extension of the index into
+        a GitCacheTree. Each directory is stored as its name, its number of
+        entries (-1 if it has been invalidated), its number of subdirectories
+        and its SHA, followed by its subdirectories.
+        """
+        position = 0
+        def parseDirectory():
+            nonlocal position
+            end = data.index(b'\0', position)
+            name = data[position:end].decode('utf-8', 'surrogateescape')
+            position = end + 1
+            end = data.index(b'\n', position)
+            entryCount, subdirectoryCount = data[position:end].split(b' ')
+            position = end + 1
+            sha = None
+            if int(entryCount) >= 0:
+                sha = data[position:position + 20].hex()
+                position += 20
+            children = dict()
+            for _ in range(int(subdirectoryCount)):
+                childName, child = parseDirectory()
+                children[childName] = child
+            return name, GitCacheTree(sha, children)
+        return parseDirectory()[1]
+
+    @staticmethod
+    def readVarint(data, position):
+        """
+        INTERNAL. Read the variable width integer at position in data, using
+        the offset encoding of git. Return the integer and the position after.
+        """
+        byte = data[position]
+        position += 1
+        value = byte & 0x7f
+        while byte & 0x80:
+            byte = data[position]
+            position += 1
+            value = ((value + 1) << 7) | (byte & 0x7f)
+        return value, position
 
 ###############################################################################
@@ -8,7 +8,7 @@
 #
 # CREATED:          07/18/2019
 #
-# LAST EDITED:      07/18/2019
+# LAST EDITED:      10/18/2026
 ###
 
 #pylint: disable=unnecessary-pass,non-parent-init-called
@@ -35,6 +35,11 @@ class IFileTreeNode(ABC):
         """Return the base name of the filesystem entry this node refers to."""
         pass
 
+    @abstractmethod
+    def isDirectory(self):
+        """Return True if this node refers to a directory."""
+        pass
+
     @abstractmethod
     def getContainingFileTree(self):
         """Return the FileTree object containing this node, if it exists."""
@@ -8,7 +8,7 @@
 #
 # CREATED:          07/18/2019
 #
-# LAST EDITED:      07/18/2019
+# LAST EDITED:      10/18/2026
 ###
 
 from abc import ABC, abstractmethod
@@ -25,4 +25,12 @@ class IRepository(ABC):
         super.__init__()
         pass
 
+    @abstractmethod
+    def getTrackedFiles(self):
+        """
+        Return the list of the paths of the files tracked by the repository,
+        relative to its root, or None if they cannot be determined.
+        """
+        pass
+
 ###############################################################################
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+###############################################################################
+# NAME:             IgnoreMatcher.py
+#
+# AUTHOR:           Ethan D. Twardy <edtwardy@mtu.edu>
+#
+# DESCRIPTION:      Decides which paths of a repository are ignored, following
+#                   the semantics of gitignore(5). The rules of each ignore
+#                   file are compiled once into a single regular expression.
+#
+# CREATED:          10/18/2026
+#
+# LAST EDITED:      10/18/2026
+###
+
+import os
+import re
+
+import FilesystemDriver
+
+###############################################################################
+# Class IgnoreRules
+###
+
+class IgnoreRules:
+    """
+    The compiled rules of the ignore files in one directory. Patterns are
+    matched against paths relative to that directory, using '/' as separator.
+    """
+
+    def __init__(self, lines):
+        """Compile the gitignore-style patterns in the list lines."""
+        rules = [rule for rule in map(self.translate, lines)
+                 if rule is not None]
+        # Directories are matched by every rule, files only by the rules that
+        # do not end in a slash.
+        self.directoryRegex, self.directoryNegations = self.compile(rules)
+        self.fileRegex, self.fileNegations = self.compile(
+            [rule for rule in rules if not rule[2]])
+
+    @staticmethod
+    def compile(rules):
+        """
+        INTERNAL. Combine rules into one regular expression. The last matching
+        rule wins in gitignore, so the alternatives are tried in reverse order
+        and the index of the group that matched identifies the deciding rule.
+        """
+        if not rules:
+            return None, []
+        rules = list(reversed(rules))
+        regex = re.compile('|'.join('(' + rule[0] + ')' for rule in rules),
+                           re.DOTALL)
+        return regex, [None] + [rule[1] for rule in rules]
+
+    @staticmethod
+    def translate(line):
+        """
+        INTERNAL. Translate one line of an ignore file into a tuple of
+        (regex, negated, directoryOnly), or None if the line has no pattern.
+        """
+        line = line.rstrip('\n')
+        # Trailing spaces are ignored unless they are escaped
+        line = re.sub(r'(?<!\\) +$', '', line)
+        if not line or line.startswith('#'):
+            return None
+        negated = line.startswith('!')
+        if negated:
+            line = line[1:]
+        directoryOnly = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            return None
+
+        # A slash anywhere but the end anchors the pattern to the directory of
+        # the ignore file. Otherwise, it may match at any depth.
+        anchored = '/' in line
+        segments = line.lstrip('/').split('/')
+        regex = '' if anchored else '(?:.*/)?'
+        for index, segment in enumerate(segments):
+            last = index == len(segments) - 1
+            if segment == '**':
+                regex += '.*' if last else '(?:.*/)?'
+            else:
+                regex += IgnoreRules.translateSegment(segment)
+                regex += '' if last else '/'
+        return regex, negated, directoryOnly
+
+    @staticmethod
+    def translateSegment(segment):
+        """INTERNAL. Translate one path component of a glob into a regex."""
+        regex = ''
+        index = 0
+        while index < len(segment):
+            char = segment[index]
+            index += 1
+            if char == '*':
+                regex += '[^/]*'
+            elif char == '?':
+                regex += '[^/]'
+            elif char == '\\' and index < len(segment):
+                regex += re.escape(segment[index])
+                index += 1
+            elif char == '[':
+                end = segment.find(']', index + 1)
+                if end < 0:
+                    regex += re.escape(char)
+                    continue
+                contents = segment[index:end]
+                index = end + 1
+                if contents.startswith('!'):
+                    contents = '^' + contents[1:]
+                # git matches the first end of a reversed range like `z-a',
+                # and nothing else of it, where Python rejects the class.
+                start = 1 if contents.startswith('^') else 0
+                contents = contents[:start] + re.sub(
+                    r'(.)-(.)', lambda bounds: bounds.group(
+                        0 if bounds.group(1) <= bounds.group(2) else 1),
+                    contents[start:])
+                bracket = '[' + contents.replace('\\', '\\\\') + ']'
+                try:
+                    re.compile(bracket)
+                except re.error:
+                    bracket = '(?!)' # Never match, rather than fail
+                regex += bracket
+            else:
+                regex += re.escape(char)
+        return regex
+
+    def match(self, path, isDir):
+        """
+        Return True if path is ignored by these rules, False if it is
+        explicitly re-included, or None if no rule matches it.
+        """
+        regex, negations = (self.directoryRegex, self.directoryNegations) \
+            if isDir else (self.fileRegex, self.fileNegations)
+        if regex is None:
+            return None
+        match = regex.fullmatch(path)
+        if match is None:
+            return None
+        return not negations[match.lastindex]
+
+###############################################################################
+# Class IgnoreMatcher
+###
+
+class IgnoreMatcher:
+    """
+    Answers whether a path of a repository is ignored. The rules of the root
+    directory come from the built-in rules, info/exclude in the git directory,
+    .gitignore and .bignore, in increasing order of precedence. The .gitignore
+    file of every other directory is read the first time a path below it is
+    looked up, and takes precedence over the rules of the directories above
+    it.
+    """
+
+    # The repository itself and the output of this tool are never scanned.
+    builtinRules = ['.git', '*~', '/bugs']
+
+    def __init__(self, root, nested=True, excludeFile=None, reader=None):
+        """
+        Initialize an IgnoreMatcher for the repository rooted at root.
+        excludeFile is the info/exclude file of its git directory, which is
+        looked up in root/.git if it is None. The ignore files of the tree are
+        read from the working tree, or by reader(path) if it is given, which
+        returns the lines of the file at path, relative to root and using '/'
+        as separator, or an empty list if it does not exist.
+        """
+        self.root = root
+        self.nested = nested
+        self.reader = reader or self.readTreeFile
+        if excludeFile is None:
+            excludeFile = os.path.join(root, '.git', 'info', 'exclude')
+        rootLines = list(self.builtinRules)
+        rootLines.extend(self.readIgnoreFile(excludeFile))
+        for filename in ('.gitignore', '.bignore'):
+            rootLines.extend(self.reader(filename))
+        self.layers = {'': IgnoreRules(rootLines)}
+        # Memoized decisions for directories, so every lookup only has to
+        # consider the path itself.
+        self.directories = {'': False}
+
+    @staticmethod
+    def readIgnoreFile(ignoreFilename):
+        """INTERNAL. Read ignoreFilename file for the list of patterns."""
+        try:
+            return FilesystemDriver.readFile(ignoreFilename).splitlines()
+        except (FileNotFoundError, NotADirectoryError, UnicodeDecodeError):
+            return []
+
+    def readTreeFile(self, path):
+        """INTERNAL. Read the ignore file at path in the working tree."""
+        return self.readIgnoreFile(os.path.join(self.root, path))
+
+    def loadDirectory(self, directory):
+        """INTERNAL. Read the .gitignore file of directory, if it has one."""
+        if not self.nested or directory in self.layers:
+            return
+        lines = self.reader(directory + '/.gitignore')
+        self.layers[directory] = IgnoreRules(lines) if lines else None
+
+    def matchEntry(self, path, isDir):
+        """
+        Return True if the rules of the directories above path ignore it. This
+        does not consider whether one of those directories is itself ignored.
+        """
+        directory = path
+        while directory:
+            slash = directory.rfind('/')
+            directory = directory[:slash] if slash >= 0 else ''
+            rules = self.layers.get(directory)
+            if rules is None:
+                continue
+            decision = rules.match(path[len(directory) + 1:] if directory
+                                   else path, isDir)
+            if decision is not None:
+                return decision
+        return False
+
+    def isIgnored(self, path, isDir=False):
+        """
+        Return True if path, relative to the root of the repository and using
+        '/' as separator, is ignored. A path is ignored when any of its parent
+        directories is, whatever the rules say about the path itself.
+        """
+        if isDir and path in self.directories:
+            return self.directories[path]
+        slash = path.rfind('/')
+        parent = path[:slash] if slash >= 0 else ''
+        if self.isIgnored(parent, True):
+            ignored = True
+        else:
+            ignored = self.matchEntry(path, isDir)
+        if isDir:
+            self.directories[path] = ignored
+            if not ignored:
+                self.loadDirectory(path)
+        return ignored
+
+###############################################################################
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+###############################################################################
+# NAME:             InotifyWatcher.py
+#
+# AUTHOR:           Ethan D. Twardy <edtwardy@mtu.edu>
+#
+# DESCRIPTION:      Minimal ctypes binding to the inotify(7) API of Linux,
+#                   used to follow changes to the files of a repository.
+#
+# CREATED:          10/18/2026
+#
+# LAST EDITED:      10/18/2026
+###
+
+from collections import namedtuple
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+
+# One event read from inotify. name is empty for events about the watched
+# directory itself.
+InotifyEvent = namedtuple('InotifyEvent', ['wd', 'mask', 'cookie', 'name'])
+
+###############################################################################
+# Class InotifyWatcher
+###
+
+class InotifyWatcher:
+    """Watches directories for changes to the entries in them."""
+
+    # Event masks, from <sys/inotify.h>
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    IN_CLOEXEC = 0o2000000
+
+    # The events that mean the contents or the list of the files changed.
+    # Files are reported once they are closed, not on every write.
+    defaultMask = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE \
+        | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+
+    eventHeader = struct.Struct('iIII')
+
+    def __init__(self):
+        """
+        Initialize an InotifyWatcher. Raises OSError if inotify is not
+        available on this system.
+        """
+        libcName = ctypes.util.find_library('c')
+        try:
+            self.libc = ctypes.CDLL(libcName, use_errno=True)
+            self.libc.inotify_init1.argtypes = [ctypes.c_int]
+            self.libc.inotify_add_watch.argtypes = [ctypes.c_int,
+                                                    ctypes.c_char_p,
+                                                    ctypes.c_uint32]
+            self.libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        except (OSError, AttributeError):
+            raise OSError(errno.ENOSYS, 'inotify is not available')
+        self.fd = self.libc.inotify_init1(self.IN_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+
+    def addWatch(self, path, mask=defaultMask):
+        """Watch the directory path. Return the watch descriptor."""
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path),
+                                         mask | self.IN_ONLYDIR)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), path)
+        return wd
+
+    def removeWatch(self, wd):
+        """Stop watching the directory with the watch descriptor wd."""
+        self.libc.inotify_rm_watch(self.fd, wd)
+
+    def readEvents(self, timeout=None):
+        """
+        Return the list of the pending events, waiting for at most timeout
+        seconds (forever if it is None) for one to arrive.
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        data = os.read(self.fd, 65536)
+        events = list()
+        position = 0
+        while position + self.eventHeader.size <= len(data):
+            wd, mask, cookie, length = self.eventHeader.unpack_from(data,
+                                                                    position)
+            position += self.eventHeader.size
+            name = data[position:position + length].rstrip(b'\0')
+            position += length
+            events.append(InotifyEvent(wd, mask, cookie, os.fsdecode(name)))
+        return events
+
+    def close(self):
+        """Release the inotify instance."""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+###############################################################################
@@ -8,7 +8,7 @@
 #
 # CREATED:          07/18/2019
 #
-# LAST EDITED:      07/18/2019
+# LAST EDITED:      10/18/2026
 ###
 
 class NotAValidRepositoryException(Exception):
@@ -19,4 +19,25 @@ class NotAValidRepositoryException(Exception):
     """
     pass
 
+class InvalidIndexException(Exception):
+    """
+    This exception is thrown when the index of a repository is malformed, or
+    uses features that are not supported.
+    """
+    pass
+
+class InvalidObjectException(Exception):
+    """
+    This exception is thrown when an object of a repository is missing, or
+    cannot be parsed.
+    """
+    pass
+
+class UnknownRevisionException(Exception):
+    """
+    This exception is thrown when a revision does not name a commit of the
+    repository.
+    """
+    pass
+
 ###############################################################################
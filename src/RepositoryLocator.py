@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+###############################################################################
+# NAME:             RepositoryLocator.py
+#
+# AUTHOR:           Ethan D. Twardy <edtwardy@mtu.edu>
+#
+# DESCRIPTION:      Finds the root of the working tree containing a directory,
+#                   with one lstat per level, and remembers the answer for
+#                   every directory on the way for the life of the process.
+#                   Kept apart from GitRepository, so printing the bugs does
+#                   not have to import it.
+#
+# CREATED:          10/18/2026
+#
+# LAST EDITED:      10/18/2026
+###
+
+import os
+
+import FilesystemDriver
+
+###############################################################################
+# Class RepositoryLocator
+###
+
+class RepositoryLocator:
+    """
+    Locates working trees: the nearest directory holding a .git directory, or
+    a .git file like submodules and linked worktrees, or the working tree of
+    the repository named by GIT_DIR, as in a git hook.
+    """
+
+    # Maps each directory looked up, and those walked through, to the root of
+    # its working tree. Directories outside of any are not remembered, so a
+    # repository created later is still found by the daemon.
+    roots = dict()
+
+    @classmethod
+    def findRoot(cls, path):
+        """
+        Return the absolute path of the root of the working tree containing
+        the directory path, or None if it is not in one.
+        """
+        directory = FilesystemDriver.abspath(path)
+        workTree = cls.getEnvironmentWorkTree()
+        visited = list()
+        while True:
+            root = cls.roots.get(directory)
+            if root is not None:
+                break
+            visited.append(directory)
+            if directory == workTree or FilesystemDriver.lexists(
+                    os.path.join(directory, '.git')):
+                root = directory
+                break
+            parent = FilesystemDriver.dirname(directory)
+            if parent == directory:
+                return None
+            directory = parent
+        for directory in visited:
+            cls.roots[directory] = root
+        return root
+
+    @staticmethod
+    def getEnvironmentWorkTree():
+        """
+        Return the absolute path of the working tree of the repository named
+        by GIT_DIR: GIT_WORK_TREE, or the current directory as git does. None
+        if GIT_DIR is not set.
+        """
+        if not os.environ.get('GIT_DIR'):
+            return None
+        return FilesystemDriver.abspath(os.environ.get('GIT_WORK_TREE') or '.')
+
+    @classmethod
+    def clear(cls):
+        """Forget every root found so far."""
+        cls.roots.clear()
+
+###############################################################################
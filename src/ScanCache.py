@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+###############################################################################
+# NAME:             ScanCache.py
+#
+# AUTHOR:           Ethan D. Twardy <edtwardy@mtu.edu>
+#
+# DESCRIPTION:      Persistent cache of the bugs found in each file of a
+#                   repository, keyed on the stat data of the file. A file is
+#                   only read again when its mtime, size or inode change.
+#
+# CREATED:          10/18/2026
+#
+# LAST EDITED:      10/18/2026
+###
+
+import json
+import os
+import sys
+
+from BugRecord import BugRecord
+
+###############################################################################
+# Class ScanCache
+###
+
+class ScanCache:
+    """Stat-keyed cache of the bugs found in each file of a repository."""
+
+    # Bump this whenever the format of the entries changes.
+    version = 1
+
+    def __init__(self, filename, signature=''):
+        """
+        Initialize a ScanCache, loading filename if it exists. The signature
+        identifies the settings the scan results depend on, and a cache that
+        was written with a different signature is discarded.
+        """
+        self.filename = filename
+        self.signature = signature
+        self.entries = dict()
+        self.dirty = False
+        self.load()
+
+    @staticmethod
+    def statKey(statResult):
+        """INTERNAL. Return the part of statResult the cache is keyed on."""
+        return [statResult.st_mtime_ns, statResult.st_size, statResult.st_ino]
+
+    def load(self):
+        """Read the cache file. A missing or corrupt cache is simply empty."""
+        try:
+            with open(self.filename, 'r') as cacheFile:
+                contents = json.load(cacheFile)
+        except (FileNotFoundError, ValueError):
+            return
+        if not isinstance(contents, dict) \
+           or contents.get('version') != self.version \
+           or contents.get('signature') != self.signature:
+            self.dirty = True
+            return
+        # The daemon keeps the cache in memory: the bugs of each file are
+        # packed in a BugRecord, and the paths are interned, so the file list
+        # and the results of a scan share them.
+        self.entries = {sys.intern(path): entry[:3] + [BugRecord(entry[3])]
+                        for path, entry
+                        in contents.get('entries', dict()).items()}
+
+    def lookup(self, path, statResult):
+        """
+        Return the BugRecord of the bugs cached for path, or None if path is
+        not in the cache or has changed since it was scanned.
+        """
+        entry = self.entries.get(path)
+        if entry is None or entry[:3] != self.statKey(statResult):
+            return None
+        return entry[3]
+
+    def store(self, path, statResult, bugs):
+        """
+        Record the bugs found in path when its stat data was statResult.
+        Return the BugRecord they are held in.
+        """
+        bugs = BugRecord.fromBugs(bugs)
+        self.entries[path] = self.statKey(statResult) + [bugs]
+        self.dirty = True
+        return bugs
+
+    def prune(self, livePaths):
+        """Drop the entries of every file that is not in livePaths."""
+        livePaths = set(livePaths)
+        for path in [path for path in self.entries if path not in livePaths]:
+            del self.entries[path]
+            self.dirty = True
+
+    def write(self):
+        """Write the cache to disk, if it has changed since it was loaded."""
+        if not self.dirty:
+            return
+        temporary = self.filename + '.tmp'
+        try:
+            with open(temporary, 'w') as cacheFile:
+                json.dump({'version': self.version,
+                           'signature': self.signature,
+                           'entries': self.entries},
+                          cacheFile, separators=(',', ':'), default=list)
+            os.replace(temporary, self.filename)
+        except OSError:
+            # The cache is only an optimization, never fail an update over it.
+            return
+        self.dirty = False
+
+###############################################################################
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+###############################################################################
+# NAME:             ScanStats.py
+#
+# AUTHOR:           Ethan D. Twardy <edtwardy@mtu.edu>
+#
+# DESCRIPTION:      Wall time per phase and counters of an update, to find out
+#                   where the time goes when it is slow.
+#
+# CREATED:          10/18/2026
+#
+# LAST EDITED:      10/18/2026
+###
+
+from contextlib import contextmanager
+import heapq
+import sys
+import time
+
+###############################################################################
+# Class ScanStats
+###
+
+class ScanStats:
+    """
+    Collects the time spent in each phase of an update, counters (files
+    visited, skipped and scanned, bytes read, bugs found) and the slowest
+    files. A disabled ScanStats records nothing, so the code being measured
+    does not have to check whether statistics were asked for.
+    """
+
+    # The number of slowest files that are reported
+    slowestCount = 10
+
+    def __init__(self, enabled=True):
+        """Initialize a ScanStats, which records nothing unless enabled."""
+        self.enabled = enabled
+        self.phases = dict()
+        self.counters = dict()
+        self.slowest = list()
+
+    @contextmanager
+    def phase(self, name):
+        """Time the body of a with statement, as part of the phase name."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) \
+                + time.perf_counter() - start
+
+    def addTime(self, name, seconds):
+        """
+        Add seconds to the phase name, for work that cannot be wrapped in a
+        with statement, like the steps of a generator.
+        """
+        if self.enabled:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def count(self, name, amount=1):
+        """Add amount to the counter name."""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def recordFile(self, fileName, seconds):
+        """Record that scanning the file fileName took seconds."""
+        if not self.enabled:
+            return
+        if len(self.slowest) < self.slowestCount:
+            heapq.heappush(self.slowest, (seconds, fileName))
+        else:
+            heapq.heappushpop(self.slowest, (seconds, fileName))
+
+    def report(self, outputFile=None):
+        """Print the statistics to outputFile, or stderr if it is None."""
+        outputFile = outputFile or sys.stderr
+        print('Phase' + ' ' * 21 + 'Seconds', file=outputFile)
+        for name, seconds in self.phases.items():
+            print('  {:<24}{:9.4f}'.format(name, seconds), file=outputFile)
+        print('  {:<24}{:9.4f}'.format('total', sum(self.phases.values())),
+              file=outputFile)
+        print('Counters', file=outputFile)
+        for name, value in self.counters.items():
+            print('  {:<24}{:9}'.format(name, value), file=outputFile)
+        if self.slowest:
+            print('Slowest files', file=outputFile)
+            for seconds, fileName in sorted(self.slowest, reverse=True):
+                print('  {:9.4f}  {}'.format(seconds, fileName),
+                      file=outputFile)
+
+###############################################################################
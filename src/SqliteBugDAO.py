@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+###############################################################################
+# NAME:             SqliteBugDAO.py
+#
+# AUTHOR:           Ethan D. Twardy <edtwardy@mtu.edu>
+#
+# DESCRIPTION:      DAO object persisting Bugs in a SQLite database, indexed by
+#                   file, tag and text, so queries on a subset of the bugs do
+#                   not have to read all of them.
+#
+# CREATED:          10/18/2026
+#
+# LAST EDITED:      10/18/2026
+###
+
+import hashlib
+import json
+import sqlite3
+
+###############################################################################
+# Class SqliteBugDAO
+###
+
+class SqliteBugDAO:
+    """
+    Data Access Object for the 'Bug' class, backed by SQLite. A bug is a
+    (path, tag, priority, text) tuple. The bugs of each file are replaced as a
+    whole, and only when they changed.
+    """
+
+    # Bump this when the schema changes. Older databases are rebuilt.
+    version = 2
+    schema = [
+        'CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, '
+        'digest TEXT NOT NULL)',
+        'CREATE TABLE IF NOT EXISTS bugs (id INTEGER PRIMARY KEY, '
+        'path TEXT NOT NULL, tag TEXT NOT NULL, priority TEXT, '
+        'text TEXT NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS bugsByPath ON bugs (path)',
+        'CREATE INDEX IF NOT EXISTS bugsByTag ON bugs (tag)',
+    ]
+    # The full text index uses trigrams, so it can answer substring queries.
+    textSchema = [
+        'CREATE VIRTUAL TABLE IF NOT EXISTS bugsText USING fts5(text, '
+        'content=\'bugs\', content_rowid=\'id\', tokenize=\'trigram\')',
+        'CREATE TRIGGER IF NOT EXISTS bugsInsert AFTER INSERT ON bugs BEGIN '
+        'INSERT INTO bugsText (rowid, text) VALUES (new.id, new.text); END',
+        'CREATE TRIGGER IF NOT EXISTS bugsDelete AFTER DELETE ON bugs BEGIN '
+        'INSERT INTO bugsText (bugsText, rowid, text) '
+        'VALUES (\'delete\', old.id, old.text); END',
+    ]
+
+    def __init__(self, filename):
+        """Initialize a SqliteBugDAO, creating the database if needed."""
+        self.filename = filename
+        self.connection = sqlite3.connect(filename, timeout=10)
+        version, = self.connection.execute('PRAGMA user_version').fetchone()
+        if version != self.version:
+            # The database is only an index of the scan results, rebuild it
+            with self.connection:
+                for table in ('bugsText', 'bugs', 'files'):
+                    self.connection.execute('DROP TABLE IF EXISTS ' + table)
+                self.connection.execute(
+                    'PRAGMA user_version = {}'.format(self.version))
+        for statement in self.schema:
+            self.connection.execute(statement)
+        try:
+            for statement in self.textSchema:
+                self.connection.execute(statement)
+            self.hasTextIndex = True
+        except sqlite3.OperationalError:
+            # SQLite was built without FTS5 or its trigram tokenizer
+            self.hasTextIndex = False
+
+    @staticmethod
+    def digest(bugs):
+        """INTERNAL. Return a digest of the list of bugs bugs."""
+        return hashlib.sha1(json.dumps(list(bugs)).encode()).hexdigest()
+
+    def synchronize(self, files):
+        """
+        Make the database hold exactly the bugs in files, a dict mapping paths
+        to lists of (tag, priority, text) tuples. Only the rows of the files
+        whose bugs changed are rewritten. Return the number of files rewritten.
+        """
+        stored = dict(self.connection.execute('SELECT path, digest '
+                                              'FROM files'))
+        changed = 0
+        with self.connection:
+            for path in stored.keys() - files.keys():
+                self.removeFile(path)
+                changed += 1
+            for path, bugs in files.items():
+                changed += self.replaceFile(path, bugs, stored.get(path))
+        return changed
+
+    def update(self, files):
+        """
+        Replace the bugs of the files in files, a dict mapping paths to lists
+        of (tag, priority, text) tuples, leaving the other files alone. Files
+        mapped to an empty list are removed. Return the number of files
+        rewritten.
+        """
+        changed = 0
+        with self.connection:
+            for path, bugs in files.items():
+                row = self.connection.execute(
+                    'SELECT digest FROM files WHERE path = ?',
+                    (path,)).fetchone()
+                if not bugs:
+                    if row is not None:
+                        self.removeFile(path)
+                        changed += 1
+                    continue
+                changed += self.replaceFile(path, bugs,
+                                            row[0] if row else None)
+        return changed
+
+    def replaceFile(self, path, bugs, storedDigest):
+        """
+        INTERNAL. Replace the bugs of the file path with bugs, unless their
+        digest is storedDigest. Return 1 if the file was rewritten, else 0.
+        """
+        bugs = [list(bug) for bug in bugs]
+        digest = self.digest(bugs)
+        if storedDigest == digest:
+            return 0
+        self.removeFile(path)
+        self.connection.execute('INSERT INTO files VALUES (?, ?)',
+                                (path, digest))
+        self.connection.executemany(
+            'INSERT INTO bugs (path, tag, priority, text) VALUES (?, ?, ?, ?)',
+            [(path, tag, priority, text) for tag, priority, text in bugs])
+        return 1
+
+    def removeFile(self, path):
+        """INTERNAL. Delete the bugs of the file path."""
+        self.connection.execute('DELETE FROM bugs WHERE path = ?', (path,))
+        self.connection.execute('DELETE FROM files WHERE path = ?', (path,))
+
+    def query(self, prefix=None, tag=None, text=None):
+        """
+        Return the list of (path, tag, priority, text) tuples of the bugs in
+        the files whose path starts with prefix, with the tag tag, and whose
+        text contains text. Criteria that are None are not applied.
+        """
+        conditions = list()
+        parameters = list()
+        if prefix:
+            # A range on the path can be answered from its index, LIKE can't
+            conditions.append('bugs.path >= ? AND bugs.path < ?')
+            parameters.extend([prefix, prefix + '\U0010ffff'])
+        if tag:
+            conditions.append('bugs.tag = ?')
+            parameters.append(tag)
+        if text and self.hasTextIndex and len(text) >= 3:
+            conditions.append('bugs.id IN (SELECT rowid FROM bugsText '
+                              'WHERE bugsText MATCH ?)')
+            parameters.append('"' + text.replace('"', '""') + '"')
+        elif text:
+            conditions.append('instr(lower(bugs.text), lower(?)) > 0')
+            parameters.append(text)
+        statement = 'SELECT path, tag, priority, text FROM bugs'
+        if conditions:
+            statement += ' WHERE ' + ' AND '.join(conditions)
+        return self.connection.execute(statement, parameters).fetchall()
+
+    def close(self):
+        """Close the database."""
+        self.connection.close()
+
+###############################################################################
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+###############################################################################
+# NAME:             BenchmarkBugs.py
+#
+# AUTHOR:           Ethan D. Twardy <edtwardy@mtu.edu>
+#
+# DESCRIPTION:      Benchmarks of bugs.py on synthetic git repositories. The
+#                   shape of the repository (file count, depth, file sizes,
+#                   TODO density, ignore rules, binary files) is configurable,
+#                   and the timings are recorded as JSON so runs on different
+#                   commits can be compared.
+#
+# CREATED:          10/18/2026
+#
+# LAST EDITED:      10/18/2026
+###
+
+from argparse import ArgumentParser
+import importlib.util
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# The root of the bugs repository, which holds the script being benchmarked
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+SCRIPT = os.path.join(ROOT, 'bugs.py')
+
+###############################################################################
+# Class RepositoryGenerator
+###
+
+class RepositoryGenerator:
+    """Generates a git repository with a given number and kind of files."""
+
+    words = ('alpha', 'beta', 'gamma', 'delta', 'buffer', 'index', 'value',
+             'node', 'parse', 'count', 'return', 'result', 'error', 'state')
+    extensions = ('.c', '.h', '.py', '.sh', '.js', '.txt')
+    comments = {'.c': '//', '.h': '/*', '.py': '#', '.sh': '#', '.js': '//',
+                '.txt': '#'}
+
+    def __init__(self, files=1000, depth=3, fileSize=4096, todoDensity=0.01,
+                 ignoreRules=10, binaryRatio=0.05, seed=0):
+        """
+        Initialize a RepositoryGenerator. fileSize is the mean size of the
+        files in bytes, todoDensity the fraction of the lines holding a TODO,
+        and binaryRatio the fraction of the files that are binary.
+        """
+        self.files = files
+        self.depth = depth
+        self.fileSize = fileSize
+        self.todoDensity = todoDensity
+        self.ignoreRules = ignoreRules
+        self.binaryRatio = binaryRatio
+        self.random = random.Random(seed)
+
+    def getParameters(self):
+        """Return the parameters of the generator, as a dict."""
+        return {'files': self.files, 'depth': self.depth,
+                'fileSize': self.fileSize, 'todoDensity': self.todoDensity,
+                'ignoreRules': self.ignoreRules,
+                'binaryRatio': self.binaryRatio}
+
+    def generate(self, path):
+        """
+        Create the repository in the directory path, and add every file to its
+        index. Return the number of TODOs written.
+        """
+        os.makedirs(path, exist_ok=True)
+        # Enough directories per level to keep them around 32 files each
+        fanout = max(2, round((self.files / 32) ** (1 / max(1, self.depth))))
+        todos = 0
+        for number in range(self.files):
+            directory = os.path.join(path, *self.getDirectory(number, fanout))
+            os.makedirs(directory, exist_ok=True)
+            if self.random.random() < self.binaryRatio:
+                fileName = os.path.join(directory, 'blob{}.bin'.format(number))
+                with open(fileName, 'wb') as outputFile:
+                    outputFile.write(bytes(self.random.getrandbits(8)
+                                           for _ in range(self.getSize())))
+                continue
+            extension = self.random.choice(self.extensions)
+            fileName = os.path.join(directory,
+                                    'file{}{}'.format(number, extension))
+            with open(fileName, 'w') as outputFile:
+                todos += self.writeText(outputFile, self.comments[extension])
+        self.writeIgnoreRules(path)
+        self.git(path, 'init', '-q')
+        self.git(path, 'add', '-A')
+        return todos
+
+    def getDirectory(self, number, fanout):
+        """INTERNAL. Return the path components of the directory of a file."""
+        components = list()
+        for level in range(self.depth):
+            number //= fanout
+            components.append('dir{}_{}'.format(level, number % fanout))
+        return components
+
+    def getSize(self):
+        """INTERNAL. Return the size of a new file."""
+        return int(self.random.expovariate(1 / self.fileSize)) + 1
+
+    def writeText(self, outputFile, comment):
+        """
+        INTERNAL. Write the lines of a text file to outputFile, with TODOs in
+        comments starting with comment. Return the number of TODOs written.
+        """
+        size = self.getSize()
+        written = 0
+        todos = 0
+        while written < size:
+            line = ' '.join(self.random.choice(self.words)
+                            for _ in range(self.random.randint(2, 10)))
+            if self.random.random() < self.todoDensity:
+                line = '{} TODO: {}'.format(comment, line)
+                todos += 1
+            outputFile.write(line + '\n')
+            written += len(line) + 1
+        return todos
+
+    def writeIgnoreRules(self, path):
+        """INTERNAL. Write a .gitignore with the configured number of rules."""
+        rules = ['*.o', 'build/', '/dist', '**/cache/*.tmp', '!keep.o']
+        with open(os.path.join(path, '.gitignore'), 'w') as outputFile:
+            for number in range(self.ignoreRules):
+                rule = rules[number % len(rules)]
+                if number >= len(rules):
+                    rule = rule.replace('.', '{}.'.format(number), 1) \
+                        if '.' in rule else rule.rstrip('/') + str(number)
+                outputFile.write(rule + '\n')
+
+    @staticmethod
+    def git(path, *args):
+        """INTERNAL. Run a git command in the repository path."""
+        subprocess.run(['git', '-C', path] + list(args), check=True,
+                       stdout=subprocess.DEVNULL)
+
+###############################################################################
+# Class Benchmark
+###
+
+class Benchmark:
+    """Times the operations of bugs.py on a repository."""
+
+    def __init__(self, path, repeat=3, jobs=1):
+        """Initialize a Benchmark of the repository path."""
+        self.path = path
+        self.repeat = repeat
+        self.jobs = jobs
+        self.bugs = self.loadScript()
+        # Keep the caches shared between repositories out of the user's home
+        self.cacheHome = tempfile.mkdtemp(prefix='bugs-benchmark-cache-')
+        self.environment = dict(os.environ, BUGS_NO_DAEMON='1',
+                                XDG_CACHE_HOME=self.cacheHome)
+
+    @staticmethod
+    def loadScript():
+        """INTERNAL. Import bugs.py as a module."""
+        spec = importlib.util.spec_from_file_location('bugs', SCRIPT)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    def time(self, function, setup=None):
+        """
+        INTERNAL. Return the timings of repeat calls to function, in seconds.
+        setup is called before each of them, and is not timed.
+        """
+        timings = list()
+        for _ in range(self.repeat):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - start)
+        return {'min': min(timings), 'median': statistics.median(timings),
+                'runs': timings}
+
+    def run(self):
+        """Return a dict of the timings of every operation."""
+        results = dict()
+        bugs = self.bugs.Bugs(self.path)
+        results['buildFileList'] = self.time(bugs.buildFileList)
+        fileList = [os.path.join(self.path, fn)
+                    for fn in bugs.buildFileList()]
+        # bugs.py imports its modules lazily, from the src directory it adds
+        # to the path when it is loaded
+        from BugScanner import BugScanner #pylint: disable=import-error
+        scanner = BugScanner()
+        results['getBugs'] = self.time(
+            lambda: [self.bugs.Bugs.tryGetBugs(fn, scanner)
+                     for fn in fileList])
+        results['updateCold'] = self.time(self.update, self.clearCaches)
+        results['updateWarm'] = self.time(self.update)
+        results['print'] = self.time(lambda: self.command('print'))
+        return results
+
+    def update(self):
+        """INTERNAL. Run bugs.py update."""
+        self.command('update', '-j', str(self.jobs))
+
+    def command(self, *args):
+        """INTERNAL. Run bugs.py end to end, in a new process."""
+        subprocess.run([sys.executable, SCRIPT] + list(args), cwd=self.path,
+                       env=self.environment, check=True,
+                       stdout=subprocess.DEVNULL)
+
+    def clearCaches(self):
+        """INTERNAL. Remove every cache, so the next update starts cold."""
+        gitDir = os.path.join(self.path, '.git')
+        for name in ('bugs-cache.json', 'bugs.sqlite'):
+            try:
+                os.unlink(os.path.join(gitDir, name))
+            except FileNotFoundError:
+                pass
+        shutil.rmtree(self.cacheHome, ignore_errors=True)
+        os.makedirs(self.cacheHome)
+
+    def close(self):
+        """Remove the caches of the benchmark."""
+        shutil.rmtree(self.cacheHome, ignore_errors=True)
+
+###############################################################################
+# Main
+###
+
+def getRevision():
+    """Return the commit of the bugs repository being benchmarked."""
+    try:
+        return subprocess.run(['git', '-C', ROOT, 'rev-parse', 'HEAD'],
+                              check=True, stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL,
+                              universal_newlines=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def recordResult(fileName, result):
+    """Append result to the list of results in the JSON file fileName."""
+    try:
+        with open(fileName) as inputFile:
+            history = json.load(inputFile)
+    except FileNotFoundError:
+        history = list()
+    history.append(result)
+    with open(fileName, 'w') as outputFile:
+        json.dump(history, outputFile, indent=2)
+        outputFile.write('\n')
+    return history
+
+def compareResult(history, result):
+    """
+    Print how result compares to the last result of the history made with the
+    same parameters.
+    """
+    previous = [entry for entry in history[:-1]
+                if entry['parameters'] == result['parameters']]
+    if not previous:
+        return
+    baseline = previous[-1]
+    print('Compared to {}:'.format(baseline['revision']))
+    for name, timing in result['results'].items():
+        if name in baseline['results']:
+            ratio = timing['min'] / max(baseline['results'][name]['min'],
+                                        1e-9)
+            print('  {:<16} {:7.2f}x'.format(name, ratio))
+
+def main():
+    """Generate a repository, benchmark bugs.py on it, record the results."""
+    parser = ArgumentParser(description='Benchmark bugs.py on a synthetic '
+                                        'repository.')
+    parser.add_argument('--files', type=int, default=1000)
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--file-size', type=int, default=4096,
+                        help='Mean size of the files, in bytes')
+    parser.add_argument('--todo-density', type=float, default=0.01,
+                        help='Fraction of the lines holding a TODO')
+    parser.add_argument('--ignore-rules', type=int, default=10)
+    parser.add_argument('--binary-ratio', type=float, default=0.05,
+                        help='Fraction of the files that are binary')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('-j', '--jobs', type=int, default=1)
+    parser.add_argument('--repository', type=str, default=None,
+                        help=('Generate the repository here and keep it, or '
+                              'reuse it if it exists'))
+    parser.add_argument('-o', '--output', type=str, default=None,
+                        help='Append the results to this JSON file')
+    args = parser.parse_args()
+
+    generator = RepositoryGenerator(args.files, args.depth, args.file_size,
+                                    args.todo_density, args.ignore_rules,
+                                    args.binary_ratio, args.seed)
+    path = args.repository or tempfile.mkdtemp(prefix='bugs-benchmark-')
+    path = os.path.realpath(path)
+    try:
+        if not os.path.isdir(os.path.join(path, '.git')):
+            start = time.perf_counter()
+            todos = generator.generate(path)
+            print('Generated {} files with {} TODOs in {:.2f}s'.format(
+                args.files, todos, time.perf_counter() - start))
+        benchmark = Benchmark(path, args.repeat, args.jobs)
+        try:
+            results = benchmark.run()
+        finally:
+            benchmark.close()
+    finally:
+        if args.repository is None:
+            shutil.rmtree(path, ignore_errors=True)
+
+    for name, timing in results.items():
+        print('{:<16} min {:9.4f}s  median {:9.4f}s'.format(
+            name, timing['min'], timing['median']))
+    result = {'revision': getRevision(), 'date': time.time(),
+              'python': platform.python_version(),
+              'parameters': dict(generator.getParameters(), jobs=args.jobs,
+                                 seed=args.seed),
+              'results': results}
+    if args.output is not None:
+        compareResult(recordResult(args.output, result), result)
+    else:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+
+if __name__ == '__main__':
+    main()
+
+###############################################################################
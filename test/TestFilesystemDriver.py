@@ -1,91 +1,314 @@
+#!/usr/bin/env python3
 ###############################################################################
-# NAME:             FilesystemDriver.py
+# NAME:             TestFilesystemDriver.py
 #
 # AUTHOR:           Ethan D. Twardy <edtwardy@mtu.edu>
 #
-# DESCRIPTION:      An abstraction layer for functions that manipulate the
-#                   native filesystem. This is employed to facilitate testing.
+# DESCRIPTION:      An in-memory implementation of the functions of
+#                   FilesystemDriver, to run the tree classes and the ignore
+#                   engine on synthetic trees of millions of entries, without
+#                   any disk I/O. Run it to time a walk of such a tree.
 #
 # CREATED:          07/27/2019
 #
-# LAST EDITED:      07/27/2019
+# LAST EDITED:      10/18/2026
 ###
 
+from argparse import ArgumentParser
 import os
-import os.path
+import posixpath
+import sys
+import time
 
-sep=os.path.sep
+sep='/'
 # Structure of internalDict and currentPath:
 # internalDict = {
-#   'dir' = True
-#   'dirEntry1' = {
-#       'dir' = True
-#       'dirSubentry1 ' = {...}
-#   }
-#   'dirEntry2' = {
-#       'dir' = False
+#   'dirEntry1': {
+#       'dirSubentry1': {...}
+#       'fileSubentry2': 'contents'
 #   }
+#   'dirEntry2': None
 # }
+# Each directory is a dict mapping the names of its entries to a dict for a
+# subdirectory, or to the contents of a file, as a string, or None for an
+# empty file. A file costs a single slot in the dict of its directory, so the
+# tree can hold millions of them. currentPath is the absolute path of the
+# current directory.
 internalDict=None
 currentPath=None
 
-def locateEntry(path):
-    """INTERNAL: Locate an entry in the simulated filesystem."""
-    components = split(path)
-    pathWalk = None
-    if components[0] == '.':
-        pathWalk = currentPath
-    pathWalk = internalDict
-    for key in split(path):
-        if key == '.':
-            continue
+# The functions that replace those of FilesystemDriver once installed
+driverFunctions = ('listdir', 'scandir', 'abspath', 'basename', 'dirname',
+                   'isdir', 'isfile', 'lexists', 'readFile', 'join', 'split')
+savedFunctions=None
 
-def listdir(path='.'):
-    """List the contents of a directory."""
+###############################################################################
+# Class DirEntry
+###
+
+class DirEntry:
+    """An entry of a directory, as returned by scandir."""
+    __slots__ = ('name', 'path', 'isDir')
+
+    def __init__(self, name, path, isDir):
+        self.name = name
+        self.path = path
+        self.isDir = isDir
+
+    def is_dir(self): #pylint: disable=invalid-name
+        """Return True if the entry is a directory."""
+        return self.isDir
+
+    def is_file(self): #pylint: disable=invalid-name
+        """Return True if the entry is a file."""
+        return not self.isDir
+
+    @staticmethod
+    def is_symlink(): #pylint: disable=invalid-name
+        """Return False, the simulated filesystem has no symbolic links."""
+        return False
+
+###############################################################################
+# Class ScandirIterator
+###
+
+class ScandirIterator:
+    """The iterator returned by scandir, which is also a context manager."""
+    def __init__(self, entries):
+        self.entries = iter(entries)
+
+    def __iter__(self):
+        return self.entries
+
+    def __next__(self):
+        return next(self.entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Stop the iteration."""
+        self.entries = iter(())
+
+###############################################################################
+# Simulated filesystem
+###
+
+def initialize(cwd='/'):
+    """Empty the simulated filesystem, and make cwd the current directory."""
+    global internalDict, currentPath #pylint: disable=global-statement
+    internalDict = dict()
+    currentPath = '/'
+    makedirs(cwd)
+    currentPath = abspath(cwd)
+
+def checkInitialized():
+    """INTERNAL: Raise an exception if initialize has not been called."""
     if internalDict is None or currentPath is None:
         raise Exception('The filesystem driver is uninitialized.')
+
+def locateEntry(path):
+    """
+    INTERNAL: Locate an entry in the simulated filesystem. Return its dict if
+    it is a directory, or its contents.
+    """
+    checkInitialized()
     pathWalk = internalDict
-    for key in split(path):
+    for key in split(abspath(path)):
+        if not key:
+            continue
+        if not isinstance(pathWalk, dict):
+            raise NotADirectoryError(20, 'Not a directory', path)
         try:
             pathWalk = pathWalk[key]
-        except KeyError as e:
-            raise FileNotFoundError(("[Errno 2] No such file or directory:"
-                                     " '{}'").format(path))
-    return list(pathWalk.keys()).remove('dir')
+        except KeyError:
+            raise FileNotFoundError(2, 'No such file or directory', path)
+    return pathWalk
+
+def makedirs(path):
+    """Create the directory path, and its missing parents."""
+    checkInitialized()
+    pathWalk = internalDict
+    for key in split(abspath(path)):
+        if not key:
+            continue
+        pathWalk = pathWalk.setdefault(key, dict())
+        if not isinstance(pathWalk, dict):
+            raise FileExistsError(17, 'File exists', path)
+
+def writeFile(path, contents=None):
+    """
+    Create or replace the file path, creating its missing parents, with the
+    string contents. None stands for an empty file, and takes no memory.
+    """
+    directory, name = posixpath.split(abspath(path))
+    makedirs(directory)
+    parent = locateEntry(directory)
+    if isinstance(parent.get(name), dict):
+        raise IsADirectoryError(21, 'Is a directory', path)
+    parent[name] = contents or None
+
+def install():
+    """
+    Replace the functions of the FilesystemDriver module with those of the
+    simulated filesystem, so the tree classes use it. uninstall restores them.
+    """
+    global savedFunctions #pylint: disable=global-statement
+    import FilesystemDriver #pylint: disable=import-outside-toplevel
+    if savedFunctions is None:
+        savedFunctions = {name: getattr(FilesystemDriver, name)
+                          for name in driverFunctions + ('sep',)}
+    for name in driverFunctions + ('sep',):
+        setattr(FilesystemDriver, name, globals()[name])
+
+def uninstall():
+    """Restore the functions of the FilesystemDriver module."""
+    global savedFunctions #pylint: disable=global-statement
+    import FilesystemDriver #pylint: disable=import-outside-toplevel
+    if savedFunctions is not None:
+        for name, function in savedFunctions.items():
+            setattr(FilesystemDriver, name, function)
+        savedFunctions = None
+
+###############################################################################
+# FilesystemDriver functions
+###
+
+def listdir(path='.'):
+    """List the contents of a directory."""
+    pathWalk = locateEntry(path)
+    if not isinstance(pathWalk, dict):
+        raise NotADirectoryError(20, 'Not a directory', path)
+    return list(pathWalk.keys())
+
+def scandir(path='.'):
+    """Return an iterator of the DirEntry objects of a directory."""
+    pathWalk = locateEntry(path)
+    if not isinstance(pathWalk, dict):
+        raise NotADirectoryError(20, 'Not a directory', path)
+    prefix = path.rstrip(sep) + sep
+    return ScandirIterator(
+        DirEntry(name, prefix + name, isinstance(entry, dict))
+        for name, entry in list(pathWalk.items()))
 
 def abspath(path):
     """Return a normalized absolutized version of the pathname path."""
-    if internalDict is None or currentPath is None:
-        raise Exception('The filesystem driver is uninitialized.')
-    pathWalk = internalDict
-    for key in split(path):
-        try:
-            pathWalk = pathWalk[key]
-        except KeyError as e:
-            raise FileNotFoundError(("[Errno 2] No such file or directory:"
-                                     " '{}'").format(path))
+    checkInitialized()
+    path = posixpath.normpath(posixpath.join(currentPath, path))
+    # POSIX allows a leading //, the simulated filesystem does not need it
+    return '/' + path.lstrip('/')
 
 def basename(path):
     """Return the basename of the pathname path."""
-    if internalDict is None or currentPath is None:
-        raise Exception('The filesystem driver is uninitialized.')
-    return split(path)[-1]
+    return posixpath.basename(path)
+
+def dirname(path):
+    """Return the directory name of the pathname path."""
+    return posixpath.dirname(path)
 
 def isdir(path):
     """Return True if path is an existing directory."""
-    if internalDict is None or currentPath is None:
-        raise Exception('The filesystem driver is uninitialized.')
+    try:
+        return isinstance(locateEntry(path), dict)
+    except OSError:
+        return False
+
+def isfile(path):
+    """Return True if path is an existing regular file."""
+    try:
+        return not isinstance(locateEntry(path), dict)
+    except OSError:
+        return False
+
+def lexists(path):
+    """Return True if path exists."""
+    try:
+        locateEntry(path)
+    except OSError:
+        return False
+    return True
+
+def readFile(path):
+    """Return the contents of the file at path."""
+    contents = locateEntry(path)
+    if isinstance(contents, dict):
+        raise IsADirectoryError(21, 'Is a directory', path)
+    return contents or ''
 
 def join(path):
     """Join one or more path components intelligently."""
-    if internalDict is None or currentPath is None:
-        raise Exception('The filesystem driver is uninitialized.')
-    sep.join(path)
+    return sep.join(path)
 
 def split(path):
     """Split path into a list of path components using the native separator."""
-    if internalDict is None or currentPath is None:
-        raise Exception('The filesystem driver is uninitialized.')
-    path.split(sep)
+    return path.split(sep)
+
+###############################################################################
+# Main
+###
+
+def generateTree(root, files, fanout, ignoreRules):
+    """
+    Fill the simulated filesystem with a repository at root holding `files'
+    empty files, in directories of `fanout' entries, and a .gitignore of
+    `ignoreRules' rules. Return the number of files expected to be ignored.
+    """
+    makedirs(posixpath.join(root, '.git'))
+    rules = ['*.o'] + ['*.tmp{}'.format(number)
+                       for number in range(ignoreRules - 1)]
+    writeFile(posixpath.join(root, '.gitignore'), '\n'.join(rules) + '\n')
+    ignored = 0
+    for number in range(files):
+        components = list()
+        directory = number // fanout
+        while directory:
+            components.append('d{}'.format(directory % fanout))
+            directory //= fanout
+        extension = '.o' if number % 10 == 0 else '.c'
+        ignored += extension == '.o'
+        writeFile(posixpath.join(root, *reversed(components),
+                                 'f{}{}'.format(number, extension)))
+    return ignored
+
+def main():
+    """Walk a synthetic tree in memory, and print how long it took."""
+    parser = ArgumentParser(description=('Time a walk of a synthetic tree in '
+                                         'the simulated filesystem.'))
+    parser.add_argument('--files', type=int, default=1000000)
+    parser.add_argument('--fanout', type=int, default=32)
+    parser.add_argument('--ignore-rules', type=int, default=100)
+    args = parser.parse_args()
+    sys.path.insert(0, os.path.join(os.path.dirname(
+        os.path.dirname(os.path.realpath(__file__))), 'src'))
+    #pylint: disable=import-outside-toplevel
+    from BugFileTree import BugFileTree
+
+    initialize('/repository')
+    start = time.perf_counter()
+    ignored = generateTree('/repository', args.files, args.fanout,
+                           args.ignore_rules)
+    print('Generated {} files in {:.2f}s'.format(
+        args.files, time.perf_counter() - start))
+    install()
+    try:
+        found = list()
+        start = time.perf_counter()
+        BugFileTree('/repository').searchTopDown(
+            lambda node: node.isDirectory() or found.append(node.getPath()))
+        print('Walked {} files in {:.2f}s'.format(
+            len(found), time.perf_counter() - start))
+        # The .gitignore itself is found, the ignored files are not
+        if len(found) != args.files - ignored + 1:
+            print('Expected {} files'.format(args.files - ignored + 1))
+            return 1
+    finally:
+        uninstall()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
 
 ###############################################################################